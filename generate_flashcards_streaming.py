@@ -8,18 +8,33 @@ Generates flashcards for CLAT GK from topic batches (2-3 topics at a time).
 This enables continuous progress updates instead of blocking 60-90 seconds.
 """
 
+import hashlib
 import json
 import os
 import re
+import sqlite3
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Callable, Optional
 
-# Load environment variables from .env file
-from dotenv import load_dotenv
-env_path = Path(__file__).parent / '.env'
-load_dotenv(env_path)
+# Load .env only when the key isn't already in the environment (CI, Docker,
+# systemd) - skips the dotenv import and file parse on the common path
+if "ANTHROPIC_API_KEY" not in os.environ:
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).parent / '.env')
 
-from anthropic import Anthropic
+import asyncio
+
+from anthropic import Anthropic, AsyncAnthropic
+
+# msgspec parses JSON straight into typed structs in C (parse + schema
+# validation in one pass). Fall back to stdlib json if not installed.
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    msgspec = None
+    MSGSPEC_AVAILABLE = False
 
 
 # Deck definitions (same as original)
@@ -47,6 +62,86 @@ TOPIC_TAGS = [
 ]
 
 
+# Per-topic card cache: unchanged topics (same source/week/content hash) are
+# served from SQLite instead of being re-sent to Claude.
+CACHE_DB_PATH = Path.home() / "clat_preparation" / "flashcards_cache.db"
+
+
+def _topic_cache_key(source: str, week: str, topic: Dict) -> str:
+    """Cache key for one topic: source + week + content hash."""
+    content_hash = topic.get('hash')
+    if not content_hash:
+        content_hash = hashlib.sha256(topic['content'].encode('utf-8')).hexdigest()
+    return hashlib.sha256(f"{source}|{week}|{content_hash}".encode('utf-8')).hexdigest()
+
+
+def _load_cached_cards(keys: List[str]) -> Dict[str, List[Dict]]:
+    """Look up cached cards for the given keys. Returns {key: cards}."""
+    if not CACHE_DB_PATH.exists():
+        return {}
+    try:
+        conn = sqlite3.connect(str(CACHE_DB_PATH))
+        try:
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT cache_key, cards_json FROM topic_cards_cache "
+                f"WHERE cache_key IN ({placeholders})",
+                keys
+            ).fetchall()
+            return {key: json.loads(cards_json) for key, cards_json in rows}
+        finally:
+            conn.close()
+    except Exception:
+        # Cache is best-effort - never block generation on it
+        return {}
+
+
+def _store_cached_cards(key: str, topic_title: str, cards: List[Dict]):
+    """Store generated cards for a topic (or fresh-batch) key."""
+    try:
+        CACHE_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(CACHE_DB_PATH))
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS topic_cards_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    topic_title TEXT,
+                    cards_json TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute(
+                "INSERT OR REPLACE INTO topic_cards_cache VALUES (?, ?, ?, ?)",
+                (key, topic_title, json.dumps(cards, ensure_ascii=False),
+                 datetime.now().isoformat())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception:
+        pass
+
+
+def _renumber_sids(cards: List[Dict], source: str, week: str, start_sid: int) -> List[Dict]:
+    """Rewrite sid: tags so merged cached + fresh cards stay contiguous."""
+    for offset, card in enumerate(cards):
+        sid_tag = f"sid:{source.lower()}_{week.lower()}_{start_sid + offset:04d}"
+        tags = card.get('tags', [])
+        card['tags'] = [sid_tag if t.startswith("sid:") else t for t in tags]
+        if not any(t.startswith("sid:") for t in card['tags']):
+            card['tags'].append(sid_tag)
+    return cards
+
+
+# Single deck/topic-tag table referenced by number in the constraints below.
+# Listing the 8 decks once (instead of in the schema example, constraint 1 and
+# constraint 5) saves ~500 input tokens per batch and keeps the cached prompt
+# prefix stable.
+DECK_TABLE = "\n".join(
+    f"   D{i} = {deck}  ->  topic:{tag}"
+    for i, (deck, tag) in enumerate(zip(DECKS, TOPIC_TAGS), start=1)
+)
+
 BATCH_FLASHCARD_PROMPT = """You are generating flashcards for CLAT GK from a batch of 2-3 topics.
 Output ONLY valid JSON in this exact schema:
 
@@ -55,25 +150,21 @@ Output ONLY valid JSON in this exact schema:
   "week": "{week}",
   "cards": [
     {{{{
-      "deck": "CLAT GK::Awards / Sports / Defence",
+      "deck": "<full deck name from the table below>",
       "front": "What is the question?",
       "back": "Concise answer.",
-      "tags": ["source:{source}", "week:{week}", "topic:Awards_Sports_Defence", "sid:{source}_{week}_####"]
+      "tags": ["source:{source}", "week:{week}", "<topic tag from the table below>", "sid:{source}_{week}_####"]
     }}}}
   ]
 }}}}
 
+Allowed decks (D1-D8), each with its matching topic tag:
+
+{deck_table}
+
 Constraints:
 
-1. deck must be one of:
-   - CLAT GK::Awards / Sports / Defence
-   - CLAT GK::Economy & Business
-   - CLAT GK::Environment & Science
-   - CLAT GK::Government Schemes & Reports
-   - CLAT GK::International Affairs
-   - CLAT GK::Polity & Constitution
-   - CLAT GK::Static GK
-   - CLAT GK::Supreme Court / High Court Judgements
+1. deck must be one of D1-D8, spelled EXACTLY as in the table above (full name, not the D-number).
 
 2. Create AS MANY cards as needed to cover EVERY factual point in the topics. For CLAT exam prep, DO NOT miss any:
    - Names (people, organizations, places)
@@ -91,7 +182,7 @@ Constraints:
 5. tags must include EXACTLY these formats (NO spaces in tags):
    - source:{source}
    - week:{week}
-   - topic:<OneOf: Awards_Sports_Defence, Economy_Business, Environment_Science, Government_Schemes_Reports, International_Affairs, Polity_Constitution, Static_GK, Supreme_Court_High_Court>
+   - the topic tag from the table above that matches the card's deck
    - sid:{source}_{week}_#### (zero-padded 4-digit unique number, use lowercase for source and week in sid)
 
 6. Return JSON only, no commentary, no markdown code blocks.
@@ -103,6 +194,66 @@ Topic Content:
 """
 
 
+if MSGSPEC_AVAILABLE:
+    class Card(msgspec.Struct):
+        """Typed card schema - decoded and validated in one C pass."""
+        deck: str
+        front: str
+        back: str
+        tags: List[str]
+
+    class Batch(msgspec.Struct):
+        """Top-level batch response schema."""
+        source: str
+        week: str
+        cards: List[Card]
+
+
+def validate_card_semantics(card: Dict[str, Any], card_idx: int) -> List[str]:
+    """Semantic checks (deck enum, tag formats) - assumes structure is valid."""
+    errors = []
+
+    if card["deck"] not in DECKS:
+        errors.append(f"Card {card_idx}: Invalid deck '{card['deck']}'")
+
+    if not card["front"].strip():
+        errors.append(f"Card {card_idx}: 'front' must be a non-empty string")
+
+    if not card["back"].strip():
+        errors.append(f"Card {card_idx}: 'back' must be a non-empty string")
+
+    tags = card["tags"]
+
+    # Check for spaces in tags
+    for tag in tags:
+        if " " in tag:
+            errors.append(f"Card {card_idx}: Tag '{tag}' contains spaces")
+
+    # Check required tag formats
+    has_source = any(tag.startswith("source:") for tag in tags)
+    has_week = any(tag.startswith("week:") for tag in tags)
+    has_topic = any(tag.startswith("topic:") for tag in tags)
+    has_sid = any(tag.startswith("sid:") for tag in tags)
+
+    if not has_source:
+        errors.append(f"Card {card_idx}: Missing 'source:' tag")
+    if not has_week:
+        errors.append(f"Card {card_idx}: Missing 'week:' tag")
+    if not has_topic:
+        errors.append(f"Card {card_idx}: Missing 'topic:' tag")
+    if not has_sid:
+        errors.append(f"Card {card_idx}: Missing 'sid:' tag")
+
+    # Validate topic tag value
+    topic_tags = [tag for tag in tags if tag.startswith("topic:")]
+    if topic_tags:
+        topic_value = topic_tags[0].split(":", 1)[1]
+        if topic_value not in TOPIC_TAGS:
+            errors.append(f"Card {card_idx}: Invalid topic tag value '{topic_value}'")
+
+    return errors
+
+
 def validate_card(card: Dict[str, Any], card_idx: int) -> List[str]:
     """Validate a single card and return list of errors."""
     errors = []
@@ -113,73 +264,48 @@ def validate_card(card: Dict[str, Any], card_idx: int) -> List[str]:
         if key not in card:
             errors.append(f"Card {card_idx}: Missing required key '{key}'")
 
-    # Validate deck
-    if "deck" in card and card["deck"] not in DECKS:
-        errors.append(f"Card {card_idx}: Invalid deck '{card['deck']}'")
-
-    # Validate front and back are non-empty strings
-    if "front" in card and (not isinstance(card["front"], str) or not card["front"].strip()):
+    # Validate field types
+    if "front" in card and not isinstance(card["front"], str):
         errors.append(f"Card {card_idx}: 'front' must be a non-empty string")
 
-    if "back" in card and (not isinstance(card["back"], str) or not card["back"].strip()):
+    if "back" in card and not isinstance(card["back"], str):
         errors.append(f"Card {card_idx}: 'back' must be a non-empty string")
 
-    # Validate tags
-    if "tags" in card:
-        if not isinstance(card["tags"], list):
-            errors.append(f"Card {card_idx}: 'tags' must be a list")
-        else:
-            tags = card["tags"]
-
-            # Check for spaces in tags
-            for tag in tags:
-                if " " in tag:
-                    errors.append(f"Card {card_idx}: Tag '{tag}' contains spaces")
-
-            # Check required tag formats
-            has_source = any(tag.startswith("source:") for tag in tags)
-            has_week = any(tag.startswith("week:") for tag in tags)
-            has_topic = any(tag.startswith("topic:") for tag in tags)
-            has_sid = any(tag.startswith("sid:") for tag in tags)
-
-            if not has_source:
-                errors.append(f"Card {card_idx}: Missing 'source:' tag")
-            if not has_week:
-                errors.append(f"Card {card_idx}: Missing 'week:' tag")
-            if not has_topic:
-                errors.append(f"Card {card_idx}: Missing 'topic:' tag")
-            if not has_sid:
-                errors.append(f"Card {card_idx}: Missing 'sid:' tag")
-
-            # Validate topic tag value
-            topic_tags = [tag for tag in tags if tag.startswith("topic:")]
-            if topic_tags:
-                topic_value = topic_tags[0].split(":", 1)[1]
-                if topic_value not in TOPIC_TAGS:
-                    errors.append(f"Card {card_idx}: Invalid topic tag value '{topic_value}'")
+    if "tags" in card and not isinstance(card["tags"], list):
+        errors.append(f"Card {card_idx}: 'tags' must be a list")
 
-    return errors
+    if errors:
+        return errors
+
+    return validate_card_semantics(card, card_idx)
 
 
-def validate_batch_output(data: Dict[str, Any], source: str, week: str) -> List[str]:
-    """Validate the batch JSON output and return list of errors."""
+def validate_batch_output(data: Dict[str, Any], source: str, week: str,
+                          skip_structure: bool = False) -> List[str]:
+    """Validate the batch JSON output and return list of errors.
+
+    With skip_structure=True (data came from a typed msgspec decode, so
+    keys and types are already guaranteed), only semantic checks run.
+    """
     errors = []
 
-    # Check top-level structure
-    if "source" not in data:
-        errors.append("Missing top-level key 'source'")
+    if not skip_structure:
+        # Check top-level structure
+        if "source" not in data:
+            errors.append("Missing top-level key 'source'")
 
-    if "week" not in data:
-        errors.append("Missing top-level key 'week'")
+        if "week" not in data:
+            errors.append("Missing top-level key 'week'")
 
-    if "cards" not in data:
-        errors.append("Missing top-level key 'cards'")
-        return errors
+        if "cards" not in data:
+            errors.append("Missing top-level key 'cards'")
+            return errors
+
+        if not isinstance(data["cards"], list):
+            errors.append("'cards' must be a list")
+            return errors
 
     cards = data["cards"]
-    if not isinstance(cards, list):
-        errors.append("'cards' must be a list")
-        return errors
 
     # Check card count (smaller range for batches)
     if len(cards) < 5:
@@ -188,12 +314,76 @@ def validate_batch_output(data: Dict[str, Any], source: str, week: str) -> List[
         errors.append(f"Too many cards: {len(cards)} (maximum 100 for a batch)")
 
     # Validate each card
+    validate = validate_card_semantics if skip_structure else validate_card
     for idx, card in enumerate(cards, start=1):
-        errors.extend(validate_card(card, idx))
+        errors.extend(validate(card, idx))
 
     return errors
 
 
+# Clients are constructed once and reused across batches - building an
+# Anthropic client per call re-creates its HTTP connection pool
+_client: Optional[Anthropic] = None
+_async_client: Optional[AsyncAnthropic] = None
+
+
+def _get_client(api_key: str) -> Anthropic:
+    global _client
+    if _client is None:
+        _client = Anthropic(api_key=api_key)
+    return _client
+
+
+def _get_async_client(api_key: str) -> AsyncAnthropic:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncAnthropic(api_key=api_key)
+    return _async_client
+
+
+def _parse_and_validate(response_text: str, source: str, week: str):
+    """Strip markdown fences, parse the JSON response and validate it.
+
+    Pure CPU work, so the async path can push it to a worker thread.
+    Returns (data, validation_errors); raises RuntimeError on parse failure.
+    """
+    # Remove markdown code blocks if present
+    if response_text.startswith('```'):
+        response_text = re.sub(r'^```(?:json)?\s*\n?', '', response_text)
+        response_text = re.sub(r'\n?```\s*$', '', response_text)
+
+    # Clean up the response text
+    response_text = response_text.strip()
+
+    # Parse JSON - msgspec decodes into typed structs and validates the
+    # structure in the same pass; fall back to stdlib json + hand checks
+    structural_errors: List[str] = []
+    typed_decode = False
+    try:
+        if MSGSPEC_AVAILABLE:
+            try:
+                batch = msgspec.json.decode(response_text.encode(), type=Batch)
+                data = msgspec.to_builtins(batch)
+                typed_decode = True
+            except msgspec.ValidationError as e:
+                # Shape is wrong somewhere - keep the field path and re-parse
+                # untyped so the remaining checks can still report everything
+                structural_errors.append(f"Schema validation: {e}")
+                data = json.loads(response_text)
+        else:
+            data = json.loads(response_text)
+    except (json.JSONDecodeError,) + ((msgspec.DecodeError,) if MSGSPEC_AVAILABLE else ()) as e:
+        raise RuntimeError(
+            f"Failed to parse JSON response: {e}\nResponse preview: {response_text[:500]}"
+        )
+
+    # Validate output (structure already covered when the typed decode succeeded)
+    validation_errors = structural_errors + validate_batch_output(
+        data, source, week, skip_structure=typed_decode
+    )
+    return data, validation_errors
+
+
 def generate_flashcards_for_topics(
     topic_batch: List[Dict],
     source: str,
@@ -218,6 +408,47 @@ def generate_flashcards_for_topics(
         RuntimeError: If API call fails or validation fails
     """
 
+    # Split topics into cached (cards already generated for this exact
+    # source/week/content) and fresh - only fresh topics get sent to Claude
+    topic_keys = [_topic_cache_key(source, week, t) for t in topic_batch]
+    cache_hits = _load_cached_cards(topic_keys)
+
+    cached_cards: List[Dict] = []
+    fresh_topics: List[Dict] = []
+    fresh_keys: List[str] = []
+    for topic, key in zip(topic_batch, topic_keys):
+        if key in cache_hits:
+            cached_cards.extend(cache_hits[key])
+        else:
+            fresh_topics.append(topic)
+            fresh_keys.append(key)
+
+    # A multi-topic group previously generated together is cached under a
+    # combined key (per-topic card attribution isn't possible after the fact)
+    batch_key = None
+    if len(fresh_topics) > 1:
+        batch_key = hashlib.sha256("|".join(fresh_keys).encode('utf-8')).hexdigest()
+        batch_hit = _load_cached_cards([batch_key])
+        if batch_key in batch_hit:
+            cached_cards.extend(batch_hit[batch_key])
+            fresh_topics = []
+
+    if not fresh_topics:
+        # Everything served from cache - no API call needed
+        cards = _renumber_sids(cached_cards, source, week, start_sid)
+        if progress_callback:
+            progress_callback(
+                f"✅ All {len(topic_batch)} topics cached - reused {len(cards)} cards"
+            )
+        return {
+            'source': source,
+            'week': week,
+            'cards': cards,
+            'topic_count': len(topic_batch),
+            'card_count': len(cards),
+            'validation_errors': []
+        }
+
     # Check for API key
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
@@ -226,29 +457,33 @@ def generate_flashcards_for_topics(
             "Please set it with: export ANTHROPIC_API_KEY='your-api-key'"
         )
 
-    # Format topics text
+    # Format topics text (fresh topics only)
     topics_text = ""
-    for i, topic in enumerate(topic_batch, 1):
+    for i, topic in enumerate(fresh_topics, 1):
         topics_text += f"\n\n=== TOPIC {i}: {topic['title']} ===\n"
         topics_text += topic['content']
 
     if progress_callback:
-        topic_titles = [t['title'][:50] for t in topic_batch]
-        progress_callback(f"Sending {len(topic_batch)} topics to Claude: {', '.join(topic_titles)}")
+        topic_titles = [t['title'][:50] for t in fresh_topics]
+        cached_note = f" ({len(topic_batch) - len(fresh_topics)} cached)" if cached_cards else ""
+        progress_callback(
+            f"Sending {len(fresh_topics)} topics to Claude{cached_note}: {', '.join(topic_titles)}"
+        )
 
     # Create prompt
     prompt = BATCH_FLASHCARD_PROMPT.format(
         topics_text=topics_text,
         source=source,
         week=week,
-        start_sid=start_sid
+        start_sid=start_sid,
+        deck_table=DECK_TABLE
     )
 
     if progress_callback:
         progress_callback(f"Waiting for Claude response (10-15 seconds)...")
 
-    # Call Claude API
-    client = Anthropic(api_key=api_key)
+    # Call Claude API (client reused across calls)
+    client = _get_client(api_key)
     message = client.messages.create(
         model="claude-sonnet-4-5-20250929",
         max_tokens=16000,  # Increased for comprehensive question coverage
@@ -267,28 +502,15 @@ def generate_flashcards_for_topics(
     if progress_callback:
         progress_callback("Received response from Claude, parsing...")
 
-    # Remove markdown code blocks if present
-    if response_text.startswith('```'):
-        response_text = re.sub(r'^```(?:json)?\s*\n?', '', response_text)
-        response_text = re.sub(r'\n?```\s*$', '', response_text)
-
-    # Clean up the response text
-    response_text = response_text.strip()
-
-    # Parse JSON
     try:
-        data = json.loads(response_text)
-    except json.JSONDecodeError as e:
-        error_msg = f"Failed to parse JSON response: {e}\nResponse preview: {response_text[:500]}"
+        data, validation_errors = _parse_and_validate(response_text, source, week)
+    except RuntimeError as e:
         if progress_callback:
-            progress_callback(f"❌ {error_msg}")
-        raise RuntimeError(error_msg)
+            progress_callback(f"❌ {e}")
+        raise
 
     if progress_callback:
-        progress_callback(f"Parsed {len(data.get('cards', []))} cards, validating...")
-
-    # Validate output
-    validation_errors = validate_batch_output(data, source, week)
+        progress_callback(f"Parsed {len(data.get('cards', []))} cards, validated")
 
     if validation_errors:
         error_msg = f"Validation failed:\n" + "\n".join(validation_errors[:5])
@@ -297,13 +519,159 @@ def generate_flashcards_for_topics(
         # Don't raise - just log warnings (cards may still be importable)
         print(f"⚠️  Validation warnings: {len(validation_errors)} issues found")
 
+    # Cache the new cards (only clean results) and merge with cached ones
+    new_cards = data.get('cards', [])
+    if new_cards and not validation_errors:
+        store_key = fresh_keys[0] if len(fresh_topics) == 1 else batch_key
+        store_title = ", ".join(t['title'][:50] for t in fresh_topics)
+        _store_cached_cards(store_key, store_title, new_cards)
+
+    all_cards = _renumber_sids(cached_cards + new_cards, source, week, start_sid)
+
     # Add metadata
     result = {
         'source': source,
         'week': week,
-        'cards': data.get('cards', []),
+        'cards': all_cards,
+        'topic_count': len(topic_batch),
+        'card_count': len(all_cards),
+        'validation_errors': validation_errors
+    }
+
+    if progress_callback:
+        progress_callback(f"✅ Generated {result['card_count']} cards from {result['topic_count']} topics")
+
+    return result
+
+
+async def agenerate_flashcards_for_topics(
+    topic_batch: List[Dict],
+    source: str,
+    week: str,
+    start_sid: int = 1,
+    progress_callback: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of generate_flashcards_for_topics.
+
+    The ~60KB JSON parse + validation loop is CPU work that would block the
+    event loop, so it runs in a worker thread via asyncio.to_thread - with
+    asyncio.gather over several batches the next API request can be issued
+    while a previous response is still being parsed.
+    """
+
+    topic_keys = [_topic_cache_key(source, week, t) for t in topic_batch]
+    cache_hits = _load_cached_cards(topic_keys)
+
+    cached_cards: List[Dict] = []
+    fresh_topics: List[Dict] = []
+    fresh_keys: List[str] = []
+    for topic, key in zip(topic_batch, topic_keys):
+        if key in cache_hits:
+            cached_cards.extend(cache_hits[key])
+        else:
+            fresh_topics.append(topic)
+            fresh_keys.append(key)
+
+    batch_key = None
+    if len(fresh_topics) > 1:
+        batch_key = hashlib.sha256("|".join(fresh_keys).encode('utf-8')).hexdigest()
+        batch_hit = _load_cached_cards([batch_key])
+        if batch_key in batch_hit:
+            cached_cards.extend(batch_hit[batch_key])
+            fresh_topics = []
+
+    if not fresh_topics:
+        cards = _renumber_sids(cached_cards, source, week, start_sid)
+        if progress_callback:
+            progress_callback(
+                f"✅ All {len(topic_batch)} topics cached - reused {len(cards)} cards"
+            )
+        return {
+            'source': source,
+            'week': week,
+            'cards': cards,
+            'topic_count': len(topic_batch),
+            'card_count': len(cards),
+            'validation_errors': []
+        }
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "ANTHROPIC_API_KEY environment variable not set.\n"
+            "Please set it with: export ANTHROPIC_API_KEY='your-api-key'"
+        )
+
+    topics_text = ""
+    for i, topic in enumerate(fresh_topics, 1):
+        topics_text += f"\n\n=== TOPIC {i}: {topic['title']} ===\n"
+        topics_text += topic['content']
+
+    if progress_callback:
+        topic_titles = [t['title'][:50] for t in fresh_topics]
+        cached_note = f" ({len(topic_batch) - len(fresh_topics)} cached)" if cached_cards else ""
+        progress_callback(
+            f"Sending {len(fresh_topics)} topics to Claude{cached_note}: {', '.join(topic_titles)}"
+        )
+
+    prompt = BATCH_FLASHCARD_PROMPT.format(
+        topics_text=topics_text,
+        source=source,
+        week=week,
+        start_sid=start_sid,
+        deck_table=DECK_TABLE
+    )
+
+    client = _get_async_client(api_key)
+    message = await client.messages.create(
+        model="claude-sonnet-4-5-20250929",
+        max_tokens=16000,
+        temperature=1,
+        messages=[
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    )
+
+    response_text = message.content[0].text
+
+    if progress_callback:
+        progress_callback("Received response from Claude, parsing...")
+
+    # CPU-bound parse + validation goes to a worker thread so the event
+    # loop stays free for the next API call
+    try:
+        data, validation_errors = await asyncio.to_thread(
+            _parse_and_validate, response_text, source, week
+        )
+    except RuntimeError as e:
+        if progress_callback:
+            progress_callback(f"❌ {e}")
+        raise
+
+    if validation_errors:
+        error_msg = f"Validation failed:\n" + "\n".join(validation_errors[:5])
+        if progress_callback:
+            progress_callback(f"⚠️  {error_msg}")
+        print(f"⚠️  Validation warnings: {len(validation_errors)} issues found")
+
+    new_cards = data.get('cards', [])
+    if new_cards and not validation_errors:
+        store_key = fresh_keys[0] if len(fresh_topics) == 1 else batch_key
+        store_title = ", ".join(t['title'][:50] for t in fresh_topics)
+        _store_cached_cards(store_key, store_title, new_cards)
+
+    all_cards = _renumber_sids(cached_cards + new_cards, source, week, start_sid)
+
+    result = {
+        'source': source,
+        'week': week,
+        'cards': all_cards,
         'topic_count': len(topic_batch),
-        'card_count': len(data.get('cards', [])),
+        'card_count': len(all_cards),
         'validation_errors': validation_errors
     }
 
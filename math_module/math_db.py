@@ -11,8 +11,10 @@ Handles all database interactions for questions, sessions, answers, and analytic
 import sqlite3
 import json
 import logging
+import random
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import uuid
 
@@ -20,6 +22,57 @@ import uuid
 logger = logging.getLogger(__name__)
 
 
+def _now_iso() -> str:
+    """Current timestamp as ISO string.
+
+    Batched methods (record_answers_bulk, finalize_session) call this once
+    and pass the value down so a 20-answer batch formats one timestamp,
+    not twenty.
+    """
+    return datetime.now().isoformat()
+
+
+# ----------------------------------------------------------------------------
+# Static SQL, hoisted to module level: passing the same str object to
+# cursor.execute every call lets sqlite3's statement-cache lookup hit on
+# identity/hash without rebuilding the string per call.
+# ----------------------------------------------------------------------------
+
+_SQL_INSERT_QUESTION = """
+    INSERT INTO math_questions
+    (topic, difficulty, question_text, correct_answer,
+     choice_a, choice_b, choice_c, choice_d,
+     correct_choice, explanation, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_QUESTION_IGNORE = _SQL_INSERT_QUESTION.replace(
+    "INSERT INTO", "INSERT OR IGNORE INTO")
+
+_SQL_INSERT_ANSWER = """
+    INSERT INTO math_answers
+    (session_id, question_id, selected_choice, is_correct,
+     time_taken_seconds, answered_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_GET_QUESTION_BY_ID = "SELECT * FROM math_questions WHERE question_id = ?"
+
+_SQL_GET_SESSION_ANSWERS = """
+    SELECT
+        a.*,
+        q.topic,
+        q.question_text,
+        q.correct_answer,
+        q.difficulty
+    FROM math_answers a
+    JOIN math_questions q ON a.question_id = q.question_id
+    WHERE a.session_id = ?
+    ORDER BY a.answered_at
+    LIMIT ? OFFSET ?
+"""
+
+
 class MathDatabase:
     """Database manager for Math Speed Games."""
 
@@ -28,16 +81,85 @@ class MathDatabase:
             db_path = Path(__file__).parent.parent / 'math_tracker.db'
 
         self.db_path = db_path
-        logger.info(f"[MATH_DB] Initializing with path: {self.db_path}")
-        logger.info(f"[MATH_DB] DB exists: {Path(self.db_path).exists()}")
+        logger.info("[MATH_DB] Initializing with path: %s", self.db_path)
+        logger.info("[MATH_DB] DB exists: %s", Path(self.db_path).exists())
         
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # cached_statements bumps sqlite3's internal LRU of prepared
+        # statements (default 100) so our query mix stays fully cached
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                    cached_statements=128)
         self.conn.row_factory = sqlite3.Row
+        self._tune_connection(self.conn)
         self._init_schema()
+
+        # Per-thread read-only connections: with WAL enabled, readers on
+        # their own connections never block the writer (self.conn) and
+        # vice versa. Created lazily in _get_read_conn.
+        self._reader_local = threading.local()
+
+        # Memoized (topic, difficulty) -> count rows; invalidated on insert
+        self._question_stats_cache = None
         
         # Log question count on init
         question_count = self.get_question_count()
-        logger.info(f"[MATH_DB] Questions in database: {question_count}")
+        logger.info("[MATH_DB] Questions in database: %s", question_count)
+
+    def _get_read_conn(self):
+        """Per-thread read-only connection for all SELECT paths.
+
+        Falls back to the shared writer connection if a read-only open
+        fails (e.g. exotic db_path), keeping behavior identical.
+        """
+        conn = getattr(self._reader_local, 'conn', None)
+        if conn is None:
+            try:
+                conn = sqlite3.connect(f"file:{self.db_path}?mode=ro",
+                                       uri=True, check_same_thread=False,
+                                       cached_statements=128)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA query_only=1")
+                conn.execute("PRAGMA busy_timeout=5000")
+                conn.execute("PRAGMA cache_size=-65536")
+                conn.execute("PRAGMA mmap_size=268435456")
+            except sqlite3.Error:
+                conn = self.conn
+            self._reader_local.conn = conn
+        return conn
+
+    def _row_cursor(self):
+        """sqlite3.Row cursor on the per-thread read connection."""
+        return self._get_read_conn().cursor()
+
+    def _read_cursor(self):
+        """Cursor returning plain tuples - cheaper than sqlite3.Row when the
+        whole result set gets materialized into dicts anyway."""
+        cursor = self._get_read_conn().cursor()
+        cursor.row_factory = None
+        return cursor
+
+    @staticmethod
+    def _rows_to_dicts(cursor, rows) -> List[Dict]:
+        """Build dicts from tuple rows using cursor.description once."""
+        cols = [d[0] for d in cursor.description]
+        return [dict(zip(cols, row)) for row in rows]
+
+    @staticmethod
+    def _tune_connection(conn):
+        """Apply performance PRAGMAs to a fresh connection.
+
+        WAL lets readers proceed while a write is in flight and
+        synchronous=NORMAL halves the fsyncs per commit (still durable
+        enough for WAL). The rest: bigger page cache, in-memory temp
+        tables, mmap'd reads and a busy timeout instead of immediate
+        SQLITE_BUSY errors.
+        """
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
 
     def _init_schema(self):
         """Initialize database schema if tables don't exist."""
@@ -84,7 +206,7 @@ class MathDatabase:
                 session_id TEXT NOT NULL,
                 question_id INTEGER NOT NULL,
                 selected_choice TEXT,
-                is_correct BOOLEAN NOT NULL,
+                is_correct INTEGER NOT NULL,
                 time_taken_seconds REAL NOT NULL,
                 answered_at TEXT NOT NULL,
                 FOREIGN KEY (session_id) REFERENCES math_sessions(session_id),
@@ -98,7 +220,7 @@ class MathDatabase:
                 setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id TEXT NOT NULL,
                 topic TEXT NOT NULL,
-                enabled BOOLEAN DEFAULT 1,
+                enabled INTEGER NOT NULL DEFAULT 1,
                 difficulty TEXT DEFAULT 'medium',
                 updated_at TEXT NOT NULL,
                 UNIQUE(user_id, topic)
@@ -121,6 +243,65 @@ class MathDatabase:
             )
         """)
 
+        # 6. math_session_topics - normalized child of math_sessions.topics.
+        # Reads come from here (no json.loads per row); the JSON column is
+        # still written for sessions created by older code.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS math_session_topics (
+                session_id TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                PRIMARY KEY (session_id, topic)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mst_topic
+            ON math_session_topics(topic, session_id)
+        """)
+
+        # Covering index for the random-sampling path in get_questions
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mq_topic_diff
+            ON math_questions(topic, difficulty, question_id)
+        """)
+
+        # Unique question text backs the INSERT OR IGNORE dedupe in
+        # add_questions_bulk (generator drift produces repeats). Skipped
+        # gracefully on legacy databases that already hold duplicates.
+        try:
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_mq_text_unique
+                ON math_questions(question_text)
+            """)
+        except sqlite3.IntegrityError:
+            pass
+
+        # Indexes for the other hot SELECT paths - without them every
+        # get_session_answers / get_user_sessions / get_overall_performance
+        # call scans its table in full
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ma_session
+            ON math_answers(session_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ma_question
+            ON math_answers(question_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ms_user_started
+            ON math_sessions(user_id, started_at DESC)
+        """)
+
+        # Partial index: get_enabled_topics resolves as an index-only scan
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ms_user_enabled
+            ON math_settings(user_id, topic) WHERE enabled = 1
+        """)
+
+        # Refresh planner statistics so the new indexes actually get used.
+        # 0x10002 = analyze-limit mode: only (re)analyzes tables whose stats
+        # are missing or stale, unlike a from-scratch ANALYZE.
+        cursor.execute("PRAGMA optimize=0x10002")
+
         self.conn.commit()
         print("✅ Math database schema initialized")
 
@@ -134,97 +315,171 @@ class MathDatabase:
         """Add a new math question."""
         cursor = self.conn.cursor()
 
-        cursor.execute("""
-            INSERT INTO math_questions
-            (topic, difficulty, question_text, correct_answer,
-             choice_a, choice_b, choice_c, choice_d,
-             correct_choice, explanation, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(_SQL_INSERT_QUESTION, (
             topic, difficulty, question_text, correct_answer,
             choices['A'], choices['B'], choices['C'], choices['D'],
-            correct_choice, explanation, datetime.now().isoformat()
+            correct_choice, explanation, _now_iso()
         ))
 
         self.conn.commit()
+        self._question_stats_cache = None
         return cursor.lastrowid
 
+    def add_questions_bulk(self, questions) -> int:
+        """Insert many questions in one transaction (one fsync, not N).
+
+        Duplicate question text is skipped: repeats within the batch are
+        filtered by an in-memory set, repeats against existing rows by
+        INSERT OR IGNORE against the unique text index.
+
+        Args:
+            questions: Iterable of dicts with the same fields as
+                add_question (topic, difficulty, question_text,
+                correct_answer, choices, correct_choice, explanation)
+
+        Returns:
+            Number of questions actually inserted
+        """
+        now_iso = _now_iso()
+        seen = set()
+
+        def rows():
+            for q in questions:
+                text = q['question_text']
+                if text in seen:
+                    continue
+                seen.add(text)
+                choices = q['choices']
+                yield (
+                    q['topic'], q['difficulty'], text,
+                    q['correct_answer'],
+                    choices['A'], choices['B'], choices['C'], choices['D'],
+                    q['correct_choice'], q.get('explanation'), now_iso
+                )
+
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(_SQL_INSERT_QUESTION_IGNORE, rows())
+        inserted = self.conn.total_changes - before
+
+        self._question_stats_cache = None
+        return inserted
+
     def get_questions(self, topics: List[str], difficulty: str,
                      limit: int = None) -> List[Dict]:
         """Get random questions for specified topics and difficulty."""
-        logger.info(f"[MATH_DB] get_questions called: topics={topics}, difficulty={difficulty}, limit={limit}")
+        logger.info("[MATH_DB] get_questions called: topics=%s, difficulty=%s, limit=%s",
+                    topics, difficulty, limit)
         
-        cursor = self.conn.cursor()
-
-        # Build query
-        placeholders = ','.join(['?' for _ in topics])
-        query = f"""
-            SELECT * FROM math_questions
-            WHERE topic IN ({placeholders})
-            AND difficulty = ?
-            ORDER BY RANDOM()
-        """
+        cursor = self._row_cursor()
 
-        params = topics + [difficulty]
+        # Bind the topic list as one JSON parameter: the SQL text is fixed
+        # regardless of len(topics), so it maps to a single cached prepared
+        # statement instead of one per placeholder count
+        topics_json = json.dumps(topics)
 
         if limit:
-            query += " LIMIT ?"
-            params.append(limit)
+            # Index-assisted sampling: pull candidate ids from the covering
+            # index (no row data, no sort), sample in Python, then fetch only
+            # the chosen rows. ORDER BY RANDOM() would score and sort every
+            # matching row before applying the LIMIT.
+            cursor.execute("""
+                SELECT question_id FROM math_questions
+                WHERE topic IN (SELECT value FROM json_each(?))
+                AND difficulty = ?
+            """, (topics_json, difficulty))
+            candidate_ids = [row[0] for row in cursor.fetchall()]
+
+            if len(candidate_ids) > limit:
+                chosen_ids = random.sample(candidate_ids, limit)
+            else:
+                chosen_ids = candidate_ids
+                random.shuffle(chosen_ids)
+
+            if not chosen_ids:
+                rows = []
+            else:
+                cursor.execute("""
+                    SELECT * FROM math_questions
+                    WHERE question_id IN (SELECT value FROM json_each(?))
+                """, (json.dumps(chosen_ids),))
+                by_id = {row['question_id']: row for row in cursor.fetchall()}
+                rows = [by_id[qid] for qid in chosen_ids]
+        else:
+            # No limit: every matching row is returned anyway, shuffled
+            cursor.execute("""
+                SELECT * FROM math_questions
+                WHERE topic IN (SELECT value FROM json_each(?))
+                AND difficulty = ?
+                ORDER BY RANDOM()
+            """, (topics_json, difficulty))
+            rows = cursor.fetchall()
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
         result = [dict(row) for row in rows]
-        logger.info(f"[MATH_DB] get_questions returned {len(result)} questions")
+        logger.info("[MATH_DB] get_questions returned %d questions", len(result))
         
-        if len(result) == 0:
-            # Log warning with diagnostic info
+        if len(result) == 0 and logger.isEnabledFor(logging.WARNING):
+            # Diagnostics only when the warning will actually be emitted
             total = self.get_question_count()
             by_topic = self.get_questions_by_topic()
-            logger.warning(f"[MATH_DB] WARNING: 0 questions returned! Total in DB: {total}, By topic: {by_topic}")
+            logger.warning("[MATH_DB] WARNING: 0 questions returned! Total in DB: %s, By topic: %s",
+                           total, by_topic)
 
         return result
 
     def get_question_by_id(self, question_id: int) -> Optional[Dict]:
         """Get a specific question by ID."""
-        cursor = self.conn.cursor()
+        cursor = self._row_cursor()
 
-        cursor.execute("""
-            SELECT * FROM math_questions WHERE question_id = ?
-        """, (question_id,))
+        cursor.execute(_SQL_GET_QUESTION_BY_ID, (question_id,))
 
         row = cursor.fetchone()
         return dict(row) if row else None
 
-    def count_questions(self, topic: str = None, difficulty: str = None) -> int:
-        """Count questions with optional filters."""
-        cursor = self.conn.cursor()
+    def _question_stats(self) -> List[Tuple]:
+        """(topic, difficulty, count) rows from one grouped scan, memoized.
 
-        query = "SELECT COUNT(*) as count FROM math_questions WHERE 1=1"
-        params = []
-
-        if topic:
-            query += " AND topic = ?"
-            params.append(topic)
-
-        if difficulty:
-            query += " AND difficulty = ?"
-            params.append(difficulty)
+        Feeds count_questions, get_question_count, get_questions_by_topic
+        and get_database_stats; add_question/add_questions_bulk invalidate
+        the cache, so read-only consumers get O(1) stats.
+        """
+        if self._question_stats_cache is None:
+            cursor = self._read_cursor()
+            cursor.execute("""
+                SELECT topic, difficulty, COUNT(*)
+                FROM math_questions
+                GROUP BY topic, difficulty
+            """)
+            self._question_stats_cache = cursor.fetchall()
+        return self._question_stats_cache
 
-        cursor.execute(query, params)
-        return cursor.fetchone()['count']
+    def count_questions(self, topic: str = None, difficulty: str = None) -> int:
+        """Count questions with optional filters."""
+        return sum(
+            count for t, d, count in self._question_stats()
+            if (topic is None or t == topic)
+            and (difficulty is None or d == difficulty)
+        )
 
     def get_question_count(self) -> int:
         """Get total question count in database."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) as count FROM math_questions")
-        return cursor.fetchone()['count']
+        return sum(count for _, _, count in self._question_stats())
+
+    def count_by_topic_difficulty(self) -> Dict[Tuple[str, str], int]:
+        """Question counts for every (topic, difficulty) pair.
+
+        One grouped scan (memoized via _question_stats) instead of a
+        count query per bucket - lets callers compute their whole work
+        set up front.
+        """
+        return {(t, d): count for t, d, count in self._question_stats()}
 
     def get_questions_by_topic(self) -> Dict[str, int]:
         """Get question count grouped by topic."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT topic, COUNT(*) as count FROM math_questions GROUP BY topic")
-        return {row['topic']: row['count'] for row in cursor.fetchall()}
+        by_topic: Dict[str, int] = {}
+        for topic, _, count in self._question_stats():
+            by_topic[topic] = by_topic.get(topic, 0) + count
+        return by_topic
 
     # ============================================================================
     # SESSIONS
@@ -233,15 +488,16 @@ class MathDatabase:
     def create_session(self, user_id: str, topics: List[str],
                       total_questions: int) -> str:
         """Create a new practice session."""
-        logger.info(f"[MATH_SESSION] Creating session for user={user_id}, topics={topics}, questions={total_questions}")
-        logger.info(f"[MATH_SESSION] DB path: {self.db_path}")
+        logger.info("[MATH_SESSION] Creating session for user=%s, topics=%s, questions=%s",
+                    user_id, topics, total_questions)
+        logger.info("[MATH_SESSION] DB path: %s", self.db_path)
         
         # Verify questions exist before creating session
         question_count = self.get_question_count()
-        logger.info(f"[MATH_SESSION] Questions in DB: {question_count}")
+        logger.info("[MATH_SESSION] Questions in DB: %s", question_count)
         
         if question_count == 0:
-            logger.error(f"[MATH_SESSION] CRITICAL: No questions in database! Cannot create valid session.")
+            logger.error("[MATH_SESSION] CRITICAL: No questions in database! Cannot create valid session.")
         
         session_id = str(uuid.uuid4())
         cursor = self.conn.cursor()
@@ -252,71 +508,140 @@ class MathDatabase:
             VALUES (?, ?, ?, ?, ?)
         """, (
             session_id, user_id, json.dumps(topics),
-            total_questions, datetime.now().isoformat()
+            total_questions, _now_iso()
         ))
 
+        # Normalized child rows - session reads pull topics from here
+        cursor.executemany("""
+            INSERT OR IGNORE INTO math_session_topics (session_id, topic)
+            VALUES (?, ?)
+        """, [(session_id, topic) for topic in topics])
+
         self.conn.commit()
-        logger.info(f"[MATH_SESSION] Created session_id={session_id}")
+        logger.info("[MATH_SESSION] Created session_id=%s", session_id)
         return session_id
 
+    def _apply_complete_session(self, cursor, session_id: str,
+                               total_time_seconds: float, correct_count: int,
+                               wrong_count: int, now_iso: str):
+        """Write session-completion stats (no commit - caller owns the txn).
+
+        Accuracy is derived in SQL from the counts just written, so it can
+        never disagree with them.
+        """
+        cursor.execute("""
+            UPDATE math_sessions
+            SET completed_at = :now,
+                total_time_seconds = :total_time,
+                correct_count = :correct,
+                wrong_count = :wrong,
+                accuracy = CASE WHEN :correct + :wrong > 0
+                                THEN :correct * 100.0 / (:correct + :wrong)
+                                ELSE 0 END
+            WHERE session_id = :session_id
+        """, {
+            'now': now_iso,
+            'total_time': total_time_seconds,
+            'correct': correct_count,
+            'wrong': wrong_count,
+            'session_id': session_id
+        })
+
     def complete_session(self, session_id: str, total_time_seconds: float,
                         correct_count: int, wrong_count: int):
         """Mark session as complete and update stats."""
         cursor = self.conn.cursor()
+        self._apply_complete_session(cursor, session_id, total_time_seconds,
+                                     correct_count, wrong_count,
+                                     _now_iso())
+        self.conn.commit()
 
-        accuracy = (correct_count / (correct_count + wrong_count) * 100) if (correct_count + wrong_count) > 0 else 0
-
-        cursor.execute("""
-            UPDATE math_sessions
-            SET completed_at = ?,
-                total_time_seconds = ?,
-                correct_count = ?,
-                wrong_count = ?,
-                accuracy = ?
-            WHERE session_id = ?
-        """, (
-            datetime.now().isoformat(),
-            total_time_seconds,
-            correct_count,
-            wrong_count,
-            accuracy,
-            session_id
-        ))
+    def finalize_session(self, session_id: str, answers: List[Tuple],
+                        total_time_seconds: float, correct_count: int,
+                        wrong_count: int, perf_updates: List[Tuple] = None):
+        """Record all answers and close the session in ONE transaction.
+
+        A 20-question session recorded answer-by-answer pays an fsync per
+        commit (~40+ syncs); batching collapses that into a single commit.
+
+        Args:
+            session_id: Session to finalize
+            answers: List of (question_id, selected_choice, is_correct,
+                     time_taken_seconds) tuples
+            total_time_seconds: Total session time
+            correct_count: Number of correct answers
+            wrong_count: Number of wrong answers
+            perf_updates: Optional list of (user_id, topic, is_correct,
+                          time_taken_seconds) topic-performance updates
+        """
+        now_iso = _now_iso()
+        cursor = self.conn.cursor()
 
-        self.conn.commit()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(_SQL_INSERT_ANSWER, [
+                (session_id, question_id, selected_choice, is_correct,
+                 time_taken, now_iso)
+                for question_id, selected_choice, is_correct, time_taken in answers
+            ])
+
+            if perf_updates:
+                for user_id, topic, is_correct, time_taken in perf_updates:
+                    self._apply_topic_performance(cursor, user_id, topic,
+                                                  is_correct, time_taken, now_iso)
+
+            self._apply_complete_session(cursor, session_id, total_time_seconds,
+                                         correct_count, wrong_count, now_iso)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    @staticmethod
+    def _session_topics(session: Dict):
+        """Resolve the topics list from the GROUP_CONCAT child-table column,
+        falling back to the legacy JSON column for old sessions."""
+        topic_list = session.pop('topic_list', None)
+        if topic_list:
+            session['topics'] = topic_list.split(',')
+        else:
+            session['topics'] = json.loads(session['topics'])
 
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session details."""
-        cursor = self.conn.cursor()
+        cursor = self._row_cursor()
 
         cursor.execute("""
-            SELECT * FROM math_sessions WHERE session_id = ?
+            SELECT s.*,
+                   (SELECT GROUP_CONCAT(topic) FROM math_session_topics t
+                    WHERE t.session_id = s.session_id) as topic_list
+            FROM math_sessions s WHERE s.session_id = ?
         """, (session_id,))
 
         row = cursor.fetchone()
         if row:
             session = dict(row)
-            session['topics'] = json.loads(session['topics'])
+            self._session_topics(session)
             return session
         return None
 
     def get_user_sessions(self, user_id: str, limit: int = 10) -> List[Dict]:
         """Get recent sessions for a user."""
-        cursor = self.conn.cursor()
+        cursor = self._read_cursor()
 
         cursor.execute("""
-            SELECT * FROM math_sessions
-            WHERE user_id = ?
-            ORDER BY started_at DESC
+            SELECT s.*,
+                   (SELECT GROUP_CONCAT(topic) FROM math_session_topics t
+                    WHERE t.session_id = s.session_id) as topic_list
+            FROM math_sessions s
+            WHERE s.user_id = ?
+            ORDER BY s.started_at DESC
             LIMIT ?
         """, (user_id, limit))
 
-        rows = cursor.fetchall()
-        sessions = []
-        for row in rows:
-            session = dict(row)
-            session['topics'] = json.loads(session['topics'])
-            sessions.append(session)
+        sessions = self._rows_to_dicts(cursor, cursor.fetchall())
+        for session in sessions:
+            self._session_topics(session)
 
         return sessions
 
@@ -330,38 +655,59 @@ class MathDatabase:
         """Record a question answer."""
         cursor = self.conn.cursor()
 
-        cursor.execute("""
-            INSERT INTO math_answers
-            (session_id, question_id, selected_choice, is_correct,
-             time_taken_seconds, answered_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(_SQL_INSERT_ANSWER, (
             session_id, question_id, selected_choice, is_correct,
-            time_taken_seconds, datetime.now().isoformat()
+            time_taken_seconds, _now_iso()
         ))
 
         self.conn.commit()
         return cursor.lastrowid
 
-    def get_session_answers(self, session_id: str) -> List[Dict]:
-        """Get all answers for a session with question details."""
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-            SELECT
-                a.*,
-                q.topic,
-                q.question_text,
-                q.correct_answer,
-                q.difficulty
-            FROM math_answers a
-            JOIN math_questions q ON a.question_id = q.question_id
-            WHERE a.session_id = ?
-            ORDER BY a.answered_at
-        """, (session_id,))
+    def record_answers_bulk(self, session_id: str, answers: List[Tuple]) -> int:
+        """Record many answers in one transaction (one fsync instead of N).
 
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        Args:
+            session_id: Session the answers belong to
+            answers: List of (question_id, selected_choice, is_correct,
+                     time_taken_seconds) tuples
+        """
+        now_iso = _now_iso()
+        with self.conn:
+            self.conn.executemany(_SQL_INSERT_ANSWER, [
+                (session_id, question_id, selected_choice, is_correct,
+                 time_taken, now_iso)
+                for question_id, selected_choice, is_correct, time_taken in answers
+            ])
+        return len(answers)
+
+    def iter_session_answers(self, session_id: str,
+                             limit: Optional[int] = None,
+                             offset: int = 0) -> Iterator[Dict]:
+        """Stream answers for a session with question details.
+
+        Yields dicts in fetchmany chunks instead of materializing the
+        whole join, so a paginating consumer only pays for the rows it
+        actually reads. SQLite treats LIMIT -1 as "no limit".
+        """
+        cursor = self._read_cursor()
+        cursor.arraysize = 64
+
+        cursor.execute(_SQL_GET_SESSION_ANSWERS,
+                       (session_id, -1 if limit is None else limit, offset))
+
+        cols = [d[0] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(cols, row))
+
+    def get_session_answers(self, session_id: str,
+                            limit: Optional[int] = None,
+                            offset: int = 0) -> List[Dict]:
+        """Get answers for a session with question details (as a list)."""
+        return list(self.iter_session_answers(session_id, limit, offset))
 
     # ============================================================================
     # SETTINGS
@@ -369,7 +715,7 @@ class MathDatabase:
 
     def get_settings(self, user_id: str) -> List[Dict]:
         """Get all topic settings for a user."""
-        cursor = self.conn.cursor()
+        cursor = self._read_cursor()
 
         cursor.execute("""
             SELECT * FROM math_settings
@@ -377,12 +723,11 @@ class MathDatabase:
             ORDER BY topic
         """, (user_id,))
 
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return self._rows_to_dicts(cursor, cursor.fetchall())
 
     def get_topic_setting(self, user_id: str, topic: str) -> Optional[Dict]:
         """Get setting for a specific topic."""
-        cursor = self.conn.cursor()
+        cursor = self._row_cursor()
 
         cursor.execute("""
             SELECT * FROM math_settings
@@ -394,53 +739,33 @@ class MathDatabase:
 
     def update_setting(self, user_id: str, topic: str,
                       enabled: bool = None, difficulty: str = None):
-        """Update or create topic setting."""
+        """Update or create topic setting (single UPSERT, no pre-SELECT)."""
         cursor = self.conn.cursor()
 
-        # Check if setting exists
-        existing = self.get_topic_setting(user_id, topic)
-
-        if existing:
-            # Update existing
-            updates = []
-            params = []
-
-            if enabled is not None:
-                updates.append("enabled = ?")
-                params.append(enabled)
-
-            if difficulty is not None:
-                updates.append("difficulty = ?")
-                params.append(difficulty)
-
-            updates.append("updated_at = ?")
-            params.append(datetime.now().isoformat())
-
-            params.extend([user_id, topic])
-
-            cursor.execute(f"""
-                UPDATE math_settings
-                SET {', '.join(updates)}
-                WHERE user_id = ? AND topic = ?
-            """, params)
-        else:
-            # Create new
-            cursor.execute("""
-                INSERT INTO math_settings
-                (user_id, topic, enabled, difficulty, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                user_id, topic,
-                enabled if enabled is not None else True,
-                difficulty if difficulty is not None else 'medium',
-                datetime.now().isoformat()
-            ))
+        # COALESCE keeps existing values for fields not being changed;
+        # on first insert the defaults (enabled=1, difficulty='medium') apply
+        cursor.execute("""
+            INSERT INTO math_settings
+            (user_id, topic, enabled, difficulty, updated_at)
+            VALUES (:user_id, :topic, COALESCE(:enabled, 1),
+                    COALESCE(:difficulty, 'medium'), :now)
+            ON CONFLICT(user_id, topic) DO UPDATE SET
+                enabled = COALESCE(:enabled, enabled),
+                difficulty = COALESCE(:difficulty, difficulty),
+                updated_at = :now
+        """, {
+            'user_id': user_id,
+            'topic': topic,
+            'enabled': None if enabled is None else int(enabled),
+            'difficulty': difficulty,
+            'now': _now_iso()
+        })
 
         self.conn.commit()
 
     def get_enabled_topics(self, user_id: str) -> List[str]:
         """Get list of enabled topics for a user."""
-        cursor = self.conn.cursor()
+        cursor = self._read_cursor()
 
         cursor.execute("""
             SELECT topic FROM math_settings
@@ -448,8 +773,7 @@ class MathDatabase:
             ORDER BY topic
         """, (user_id,))
 
-        rows = cursor.fetchall()
-        return [row['topic'] for row in rows]
+        return [row[0] for row in cursor.fetchall()]
 
     # ============================================================================
     # PERFORMANCE ANALYTICS
@@ -459,102 +783,105 @@ class MathDatabase:
                                 correct: bool, time_taken: float):
         """Update performance stats for a topic."""
         cursor = self.conn.cursor()
+        self._apply_topic_performance(cursor, user_id, topic, correct,
+                                      time_taken, _now_iso())
+        self.conn.commit()
 
-        # Get existing performance
-        cursor.execute("""
-            SELECT * FROM math_topic_performance
-            WHERE user_id = ? AND topic = ?
-        """, (user_id, topic))
-
-        existing = cursor.fetchone()
-
-        if existing:
-            # Update existing
-            new_total_attempts = existing['total_attempts'] + 1
-            new_correct_attempts = existing['correct_attempts'] + (1 if correct else 0)
-            new_total_time = existing['total_time_seconds'] + time_taken
-            new_avg_time = new_total_time / new_total_attempts
-            new_accuracy = (new_correct_attempts / new_total_attempts) * 100
+    def _apply_topic_performance(self, cursor, user_id: str, topic: str,
+                                correct: bool, time_taken: float, now_iso: str):
+        """Apply one topic-performance update (no commit - caller owns the txn).
 
-            cursor.execute("""
-                UPDATE math_topic_performance
-                SET total_attempts = ?,
-                    correct_attempts = ?,
-                    total_time_seconds = ?,
-                    average_time_per_question = ?,
-                    accuracy = ?,
-                    last_practiced = ?
-                WHERE user_id = ? AND topic = ?
-            """, (
-                new_total_attempts, new_correct_attempts, new_total_time,
-                new_avg_time, new_accuracy, datetime.now().isoformat(),
-                user_id, topic
-            ))
-        else:
-            # Create new
-            accuracy = 100.0 if correct else 0.0
+        Single UPSERT: counters increment in SQL (unqualified columns in the
+        DO UPDATE expressions refer to pre-update values), so no SELECT
+        roundtrip or Python arithmetic is needed.
+        """
+        cursor.execute("""
+            INSERT INTO math_topic_performance
+            (user_id, topic, total_attempts, correct_attempts,
+             total_time_seconds, average_time_per_question,
+             accuracy, last_practiced)
+            VALUES (:user_id, :topic, 1, :correct, :time_taken, :time_taken,
+                    :correct * 100.0, :now)
+            ON CONFLICT(user_id, topic) DO UPDATE SET
+                total_attempts = total_attempts + 1,
+                correct_attempts = correct_attempts + :correct,
+                total_time_seconds = total_time_seconds + :time_taken,
+                average_time_per_question =
+                    (total_time_seconds + :time_taken) / (total_attempts + 1),
+                accuracy =
+                    (correct_attempts + :correct) * 100.0 / (total_attempts + 1),
+                last_practiced = :now
+        """, {
+            'user_id': user_id,
+            'topic': topic,
+            'correct': 1 if correct else 0,
+            'time_taken': time_taken,
+            'now': now_iso
+        })
 
-            cursor.execute("""
-                INSERT INTO math_topic_performance
-                (user_id, topic, total_attempts, correct_attempts,
-                 total_time_seconds, average_time_per_question,
-                 accuracy, last_practiced)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                user_id, topic, 1, 1 if correct else 0,
-                time_taken, time_taken, accuracy,
-                datetime.now().isoformat()
-            ))
+    def get_topic_performance(self, user_id: str, topic: str = None) -> List[Dict]:
+        """Get performance stats for topics.
 
-        self.conn.commit()
+        Aggregated straight from math_answers (one indexed GROUP BY scan)
+        instead of the math_topic_performance rollup table, so recording an
+        answer costs no extra writes and the stats can never go stale.
+        """
+        cursor = self._read_cursor()
 
-    def get_topic_performance(self, user_id: str, topic: str = None) -> List[Dict]:
-        """Get performance stats for topics."""
-        cursor = self.conn.cursor()
+        query = """
+            SELECT
+                q.topic as topic,
+                COUNT(*) as total_attempts,
+                SUM(CASE WHEN a.is_correct = 1 THEN 1 ELSE 0 END) as correct_attempts,
+                SUM(a.time_taken_seconds) as total_time_seconds,
+                AVG(a.time_taken_seconds) as average_time_per_question,
+                SUM(CASE WHEN a.is_correct = 1 THEN 1 ELSE 0 END) * 100.0
+                    / COUNT(*) as accuracy,
+                MAX(a.answered_at) as last_practiced
+            FROM math_answers a
+            JOIN math_questions q ON a.question_id = q.question_id
+            JOIN math_sessions s ON a.session_id = s.session_id
+            WHERE s.user_id = ?
+        """
+        params = [user_id]
 
         if topic:
-            cursor.execute("""
-                SELECT * FROM math_topic_performance
-                WHERE user_id = ? AND topic = ?
-            """, (user_id, topic))
-        else:
-            cursor.execute("""
-                SELECT * FROM math_topic_performance
-                WHERE user_id = ?
-                ORDER BY topic
-            """, (user_id,))
+            query += " AND q.topic = ?"
+            params.append(topic)
 
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        query += " GROUP BY q.topic ORDER BY q.topic"
+
+        cursor.execute(query, params)
+        results = self._rows_to_dicts(cursor, cursor.fetchall())
+        for row in results:
+            row['user_id'] = user_id
+        return results
 
     def get_overall_performance(self, user_id: str) -> Dict:
         """Get overall performance summary."""
-        cursor = self.conn.cursor()
-
-        # Total sessions
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM math_sessions
-            WHERE user_id = ? AND completed_at IS NOT NULL
-        """, (user_id,))
-        total_sessions = cursor.fetchone()['count']
+        cursor = self._row_cursor()
 
-        # Total questions
+        # One roundtrip: JOIN instead of the correlated
+        # `session_id IN (SELECT ...)` subquery (which the planner may
+        # re-execute per row), with the session count folded in as a
+        # scalar subquery backed by idx_ms_user_started
         cursor.execute("""
             SELECT
-                COUNT(*) as total_questions,
-                SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) as correct,
-                AVG(time_taken_seconds) as avg_time
-            FROM math_answers
-            WHERE session_id IN (
-                SELECT session_id FROM math_sessions WHERE user_id = ?
-            )
-        """, (user_id,))
+                (SELECT COUNT(*) FROM math_sessions
+                 WHERE user_id = ? AND completed_at IS NOT NULL) as total_sessions,
+                COUNT(a.answer_id) as total_questions,
+                SUM(CASE WHEN a.is_correct = 1 THEN 1 ELSE 0 END) as correct,
+                AVG(a.time_taken_seconds) as avg_time
+            FROM math_answers a
+            JOIN math_sessions s ON a.session_id = s.session_id
+            WHERE s.user_id = ?
+        """, (user_id, user_id))
 
         stats = cursor.fetchone()
 
         if stats and stats['total_questions']:
             return {
-                'total_sessions': total_sessions,
+                'total_sessions': stats['total_sessions'],
                 'total_questions': stats['total_questions'],
                 'correct_count': stats['correct'] or 0,
                 'accuracy': (stats['correct'] / stats['total_questions'] * 100) if stats['total_questions'] > 0 else 0,
@@ -570,39 +897,34 @@ class MathDatabase:
             }
 
     def get_database_stats(self) -> Dict:
-        """Get overall database statistics."""
-        cursor = self.conn.cursor()
-        
-        # Total questions
-        cursor.execute("SELECT COUNT(*) as total FROM math_questions")
-        total_questions = cursor.fetchone()['total']
-        
-        # Questions by topic
-        cursor.execute("""
-            SELECT topic, COUNT(*) as count
-            FROM math_questions
-            GROUP BY topic
-            ORDER BY topic
-        """)
-        by_topic = {row['topic']: row['count'] for row in cursor.fetchall()}
-        
-        # Questions by difficulty
-        cursor.execute("""
-            SELECT difficulty, COUNT(*) as count
-            FROM math_questions
-            GROUP BY difficulty
-            ORDER BY difficulty
-        """)
-        by_difficulty = {row['difficulty']: row['count'] for row in cursor.fetchall()}
-        
+        """Get overall database statistics (one grouped scan, memoized)."""
+        total_questions = 0
+        by_topic: Dict[str, int] = {}
+        by_difficulty: Dict[str, int] = {}
+
+        for topic, difficulty, count in self._question_stats():
+            total_questions += count
+            by_topic[topic] = by_topic.get(topic, 0) + count
+            by_difficulty[difficulty] = by_difficulty.get(difficulty, 0) + count
+
         return {
             'total_questions': total_questions,
-            'by_topic': by_topic,
-            'by_difficulty': by_difficulty
+            'by_topic': dict(sorted(by_topic.items())),
+            'by_difficulty': dict(sorted(by_difficulty.items()))
         }
 
     def close(self):
-        """Close database connection."""
+        """Close database connections (writer + this thread's reader)."""
+        reader = getattr(self._reader_local, 'conn', None)
+        if reader is not None and reader is not self.conn:
+            reader.close()
+            self._reader_local.conn = None
+        try:
+            # Incrementally refresh planner stats for whatever this
+            # process actually queried; near-free on small tables.
+            self.conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
         self.conn.close()
 
 
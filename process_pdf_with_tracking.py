@@ -14,11 +14,13 @@ NOTE: This is a legacy script. The recommended approach is to use
 the assessment_processor.py via /api/assessment/create-progress endpoint.
 """
 
+import atexit
 import sys
 import os
 import json
 import subprocess
 import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import List, Dict, Tuple
@@ -30,9 +32,54 @@ STATUS_DIR = Path.home() / "clat_preparation" / "processing_status"
 # Create status directory if it doesn't exist
 STATUS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Page counts cached by path + mtime: fitz.open parses the xref table
+# just to read page_count, which is disk-heavy on big PDFs. Unchanged
+# files hit the cache on every scan after the first.
+PAGECOUNT_CACHE_PATH = STATUS_DIR / "pagecount_cache.json"
+_pagecount_cache = None
+_pagecount_cache_dirty = False
+
+
+def get_page_count(pdf_path: str) -> int:
+    """Page count for a PDF, cached on disk keyed by path + mtime."""
+    global _pagecount_cache, _pagecount_cache_dirty
+
+    if _pagecount_cache is None:
+        try:
+            _pagecount_cache = json.loads(PAGECOUNT_CACHE_PATH.read_text())
+        except Exception:
+            _pagecount_cache = {}
+        atexit.register(_save_pagecount_cache)
+
+    mtime = int(os.stat(pdf_path).st_mtime)
+    key = f"{pdf_path}:{mtime}"
+    pages = _pagecount_cache.get(key)
+    if pages is None:
+        doc = fitz.open(pdf_path)
+        pages = doc.page_count
+        doc.close()
+        _pagecount_cache[key] = pages
+        _pagecount_cache_dirty = True
+    return pages
+
+
+def _save_pagecount_cache():
+    if not _pagecount_cache_dirty or _pagecount_cache is None:
+        return
+    try:
+        tmp = PAGECOUNT_CACHE_PATH.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(_pagecount_cache, separators=(',', ':')))
+        os.replace(tmp, PAGECOUNT_CACHE_PATH)
+    except Exception:
+        pass
+
 
 def update_status(pdf_id: str, status: str, progress: int = 0):
-    """Write status update to file for frontend to read."""
+    """Write status update to file for frontend to read.
+
+    Written to a temp file then renamed so the frontend poller never
+    sees a half-written JSON file.
+    """
     try:
         status_file = STATUS_DIR / f"{pdf_id}.json"
         data = {
@@ -41,8 +88,9 @@ def update_status(pdf_id: str, status: str, progress: int = 0):
             'timestamp': time.time(),
             'pdf_id': pdf_id
         }
-        with open(status_file, 'w') as f:
-            json.dump(data, f)
+        tmp_file = status_file.with_suffix('.json.tmp')
+        tmp_file.write_text(json.dumps(data, separators=(',', ':')))
+        os.replace(tmp_file, status_file)
     except Exception as e:
         print(f"⚠️ Could not write status: {e}")
 
@@ -50,9 +98,7 @@ def update_status(pdf_id: str, status: str, progress: int = 0):
 def should_chunk_pdf(pdf_path: str) -> Tuple[bool, int]:
     """Determine if PDF needs chunking based on page count."""
     try:
-        doc = fitz.open(pdf_path)
-        total_pages = len(doc)
-        doc.close()
+        total_pages = get_page_count(pdf_path)
         return (total_pages > 12, total_pages)
     except Exception as e:
         print(f"Error checking PDF: {e}")
@@ -69,24 +115,41 @@ def chunk_pdf_if_needed(pdf_path: str) -> List[str]:
 
     print(f"📄 PDF has {total_pages} pages - chunking...")
 
-    # Run intelligent chunking
+    # Run intelligent chunking, streaming stdout line-by-line: only the
+    # last line (the JSON summary) is kept, so memory stays bounded no
+    # matter how verbose the chunker log gets.
     script_dir = Path(__file__).parent
-    result = subprocess.run(
+    proc = subprocess.Popen(
         ['python3', str(script_dir / 'intelligent_chunk_pdf.py'), pdf_path, '8', '15'],
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
         cwd=str(script_dir)
     )
 
-    if result.returncode != 0:
-        print(f"❌ Chunking failed: {result.stderr}")
+    # Drain stderr on a thread while we read stdout - if the chunker
+    # writes more than a pipe buffer to stderr, reading the streams
+    # sequentially would deadlock both processes.
+    stderr_chunks = []
+    stderr_thread = threading.Thread(
+        target=lambda: stderr_chunks.append(proc.stderr.read()))
+    stderr_thread.start()
+
+    json_line = ''
+    for line in proc.stdout:
+        line = line.strip()
+        if line:
+            json_line = line
+    stderr_thread.join()
+    stderr_output = stderr_chunks[0] if stderr_chunks else ''
+    proc.wait()
+
+    if proc.returncode != 0:
+        print(f"❌ Chunking failed: {stderr_output}")
         return [pdf_path]
 
     # Parse JSON output to get chunk files
     try:
-        # Get last line which should be JSON
-        output_lines = result.stdout.strip().split('\n')
-        json_line = output_lines[-1]
         chunk_info = json.loads(json_line)
 
         if chunk_info.get('chunk_count', 0) == 0:
@@ -96,19 +159,51 @@ def chunk_pdf_if_needed(pdf_path: str) -> List[str]:
         return chunk_info['chunk_files']
     except (json.JSONDecodeError, KeyError, IndexError) as e:
         print(f"⚠️  Could not parse chunking output: {e}")
-        print(f"Output: {result.stdout}")
+        print(f"Last output line: {json_line}")
         return [pdf_path]
 
 
 def generate_flashcards_for_pdf(pdf_path: str, source: str, week: str) -> int:
-    """Generate flashcards and save to local database."""
+    """Generate flashcards and save to local database.
+
+    Runs generate_flashcards in-process when importable (saves an
+    interpreter start + module import per chunk); falls back to the
+    old venv-subprocess path if the deps aren't available here.
+    """
+    print(f"  🎴 Generating flashcards...")
+
+    try:
+        import generate_flashcards as gf
+    except ImportError:
+        gf = None
+
+    if gf is not None:
+        try:
+            # generate_flashcards expects a Path (it uses pdf_path.name)
+            data = gf.generate_flashcards(Path(pdf_path), source, week)
+            cards = data.get('cards', [])
+            errors = gf.validate_output(data, source, week)
+            if errors:
+                print(f"  ⚠️  {len(errors)} validation errors; first: {errors[0]}")
+                return 0
+            # Keep the JSON artifact the CLI run used to write
+            gf.OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(gf.OUTPUT_PATH, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            return len(cards)
+        except Exception as e:
+            # This is the main generation step failing - show the full
+            # traceback rather than a truncated one-liner
+            import traceback
+            traceback.print_exc()
+            print(f"  ⚠️  Flashcard generation had issues: {e}")
+            return 0
+
+    # Fallback: subprocess into the venv that has the dependencies
     script_dir = Path(__file__).parent
     venv_python = Path.home() / 'clat_preparation' / 'venv_clat' / 'bin' / 'python3'
     python_exe = str(venv_python) if venv_python.exists() else 'python3'
 
-    print(f"  🎴 Generating flashcards...")
-
-    # Generate flashcards (saves to local database via generate_flashcards.py)
     result = subprocess.run(
         [python_exe, str(script_dir / 'generate_flashcards.py'), pdf_path, source, week],
         capture_output=True,
@@ -140,17 +235,17 @@ def generate_flashcards_for_pdf(pdf_path: str, source: str, week: str) -> int:
     return 0
 
 
-def update_processing_status(pdf_id: str, status_data: Dict):
-    """Update pdf_processing_status table."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT OR REPLACE INTO pdf_processing_status
-        (pdf_id, original_filename, original_filepath, is_processed, is_chunked,
-         chunk_count, chunk_files, mcq_count, anki_card_count, processed_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-    """, (
+_PROCESSING_STATUS_SQL = """
+    INSERT OR REPLACE INTO pdf_processing_status
+    (pdf_id, original_filename, original_filepath, is_processed, is_chunked,
+     chunk_count, chunk_files, mcq_count, anki_card_count, processed_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+"""
+
+
+def _status_row(pdf_id: str, status_data: Dict) -> tuple:
+    """Build a pdf_processing_status parameter tuple."""
+    return (
         pdf_id,
         status_data['filename'],
         status_data['filepath'],
@@ -160,11 +255,36 @@ def update_processing_status(pdf_id: str, status_data: Dict):
         json.dumps(status_data['chunk_files']),
         status_data['mcq_count'],
         status_data['card_count'],  # stored in anki_card_count column
-    ))
+    )
 
-    conn.commit()
-    conn.close()
-    print(f"\n✅ Database updated for {pdf_id}")
+
+def bulk_update_processing_status(status_items: List[Tuple[str, Dict]]):
+    """Update pdf_processing_status for many PDFs in one transaction.
+
+    One fsync for the whole batch instead of one per PDF - use this from
+    batch scripts that process several PDFs in a run.
+
+    Args:
+        status_items: list of (pdf_id, status_data) pairs, where
+            status_data matches update_processing_status's dict.
+    """
+    if not status_items:
+        return
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        with conn:
+            conn.executemany(_PROCESSING_STATUS_SQL, [
+                _status_row(pdf_id, status_data)
+                for pdf_id, status_data in status_items
+            ])
+    finally:
+        conn.close()
+    print(f"\n✅ Database updated for {len(status_items)} PDF(s)")
+
+
+def update_processing_status(pdf_id: str, status_data: Dict):
+    """Update pdf_processing_status table for a single PDF."""
+    bulk_update_processing_status([(pdf_id, status_data)])
 
 
 def process_pdf_complete(pdf_path: str, source: str, week: str):
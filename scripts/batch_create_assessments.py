@@ -4,11 +4,13 @@ Batch create assessments for all small PDFs (≤13 pages).
 Questions are tagged with exact PDF filename for clarity.
 """
 
+import asyncio
+import functools
 import os
+import re
 import sys
 import json
 import time
-import fitz  # PyMuPDF
 from pathlib import Path
 from datetime import datetime
 
@@ -18,12 +20,30 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from server.questions_db import QuestionsDatabase
 from server.topic_extractor import TopicExtractor
 from generate_flashcards_streaming import generate_flashcards_for_topics
+from process_pdf_with_tracking import get_page_count
 import anthropic
 import random
 
 # Constants
 MAX_PAGES = 13
 BATCH_SIZE = 25  # For MCQ generation
+MCQ_CONCURRENCY = 5  # Concurrent choice-generation requests
+
+# Compiled once - these run per filename during folder scans
+_WEEK_RE = re.compile(r'week[_-]?(\d+)', re.IGNORECASE)
+_DAY_RE = re.compile(r'(\d{1,2})(?:st|nd|rd|th)?', re.IGNORECASE)
+
+# Static instructions live in the system prompt (marked cacheable, so
+# Anthropic's prompt caching amortizes them across batches); the user
+# message carries only the compact question payload.
+MCQ_SYSTEM_PROMPT = """You receive a JSON array of questions: [{"i": 1, "q": "<question>", "a": "<correct answer>"}, ...]
+
+Generate 3 plausible but INCORRECT answer choices for each question.
+
+Return ONLY a JSON array:
+[{"question_index": 1, "distractors": ["wrong1", "wrong2", "wrong3"]}, ...]
+
+No markdown, no explanation."""
 
 def get_small_pdfs():
     """Get all PDFs with ≤13 pages from the 3 folders."""
@@ -34,33 +54,46 @@ def get_small_pdfs():
     ]
     
     small_pdfs = []
-    
+
     for folder in folders:
-        for pdf_path in sorted(folder.glob("*.pdf")):
-            # Skip tracked files
-            if "_tracked" in pdf_path.name:
-                continue
-            
+        # Filter by name at the scandir layer - no Path object or stat
+        # for tracked files and non-PDFs
+        try:
+            with os.scandir(folder) as dir_iter:
+                pdf_entries = sorted(
+                    (e.path, e.name) for e in dir_iter
+                    if e.name.endswith(".pdf") and "_tracked" not in e.name
+                    and e.is_file(follow_symlinks=False)
+                )
+        except OSError:
+            continue
+
+        for pdf_path, pdf_name in pdf_entries:
             try:
-                doc = fitz.open(str(pdf_path))
-                pages = doc.page_count
-                doc.close()
-                
+                # Cached by path+mtime - repeat scans skip the fitz parse
+                pages = get_page_count(pdf_path)
+
                 if pages <= MAX_PAGES:
                     small_pdfs.append({
-                        'path': str(pdf_path),
-                        'filename': pdf_path.name,
+                        'path': pdf_path,
+                        'filename': pdf_name,
                         'folder': folder.name,
                         'pages': pages
                     })
             except Exception as e:
-                print(f"Error reading {pdf_path.name}: {e}")
-    
+                print(f"Error reading {pdf_name}: {e}")
+
     return small_pdfs
 
 
+@functools.lru_cache(maxsize=4096)
 def extract_source_and_week(filename, folder):
-    """Extract source name and week from filename."""
+    """Extract source name and week from filename.
+
+    Pure over (filename, folder) apart from the current-month fallback,
+    so results are memoized - repeat calls during a run skip the regex
+    work.
+    """
     filename_lower = filename.lower()
     
     # Determine source
@@ -83,14 +116,13 @@ def extract_source_and_week(filename, folder):
         month = now.strftime("%b")
     
     # Try to extract week number
-    import re
-    week_match = re.search(r'week[_-]?(\d+)', filename_lower)
+    week_match = _WEEK_RE.search(filename_lower)
     if week_match:
         week_num = week_match.group(1)
         week = f"2025_{month}_W{week_num}"
     else:
         # Daily - use date
-        date_match = re.search(r'(\d{1,2})(?:st|nd|rd|th)?', filename_lower)
+        date_match = _DAY_RE.search(filename_lower)
         if date_match:
             day = date_match.group(1)
             week = f"2025_{month}_D{day}"
@@ -100,63 +132,81 @@ def extract_source_and_week(filename, folder):
     return source, week
 
 
+def _mcq_request_kwargs(questions):
+    """Build messages.create kwargs for a batch of questions."""
+    payload = json.dumps(
+        [{"i": i + 1, "q": q['question'], "a": q['answer']}
+         for i, q in enumerate(questions)],
+        separators=(',', ':'), ensure_ascii=False)
+    return {
+        'model': "claude-3-5-haiku-20241022",
+        'max_tokens': 4096,
+        'system': [{
+            "type": "text",
+            "text": MCQ_SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"}
+        }],
+        'messages': [{"role": "user", "content": payload}]
+    }
+
+
+def _parse_mcq_response(response_text, questions):
+    """Map a choices response back to {question_index: choices dict}."""
+    results = json.loads(response_text)
+
+    output = {}
+    for item in results:
+        idx = item.get('question_index', 0) - 1
+        if 0 <= idx < len(questions):
+            distractors = item.get('distractors', [])
+            if len(distractors) >= 3:
+                # One RNG draw and a direct insert - no shuffle/.index()
+                correct_index = random.randrange(4)
+                choices = distractors[:3]
+                choices.insert(correct_index, questions[idx]['answer'])
+                output[idx] = {'choices': choices, 'correct_index': correct_index}
+
+    return output
+
+
 def generate_mcq_choices(client, questions):
     """Generate MCQ choices for a batch of questions."""
     if not questions:
         return {}
-    
-    questions_text = []
-    for i, q in enumerate(questions):
-        questions_text.append(f"""[Question {i+1}]
-Question: {q['question']}
-Correct Answer: {q['answer']}
-""")
 
-    prompt = f"""Generate 3 plausible but INCORRECT answer choices for each question.
-
-Questions:
-{''.join(questions_text)}
+    try:
+        message = client.messages.create(**_mcq_request_kwargs(questions))
+        return _parse_mcq_response(message.content[0].text.strip(), questions)
+    except Exception as e:
+        print(f"    ❌ Error generating choices: {e}")
+        return {}
 
-Return ONLY a JSON array:
-[{{"question_index": 1, "distractors": ["wrong1", "wrong2", "wrong3"]}}, ...]
 
-No markdown, no explanation."""
+async def generate_mcq_choices_async(async_client, questions):
+    """Async variant of generate_mcq_choices for concurrent batches."""
+    if not questions:
+        return {}
 
     try:
-        message = client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        response_text = message.content[0].text.strip()
-        
-        # Clean markdown
-        if response_text.startswith('```'):
-            lines = response_text.split('\n')
-            response_text = '\n'.join(lines[1:-1] if lines[-1] == '```' else lines[1:])
-        
-        results = json.loads(response_text)
-        
-        output = {}
-        for item in results:
-            idx = item.get('question_index', 0) - 1
-            if 0 <= idx < len(questions):
-                distractors = item.get('distractors', [])
-                if len(distractors) >= 3:
-                    correct_answer = questions[idx]['answer']
-                    choices = distractors[:3] + [correct_answer]
-                    random.shuffle(choices)
-                    correct_index = choices.index(correct_answer)
-                    output[idx] = {'choices': choices, 'correct_index': correct_index}
-        
-        return output
-        
+        message = await async_client.messages.create(**_mcq_request_kwargs(questions))
+        return _parse_mcq_response(message.content[0].text.strip(), questions)
     except Exception as e:
         print(f"    ❌ Error generating choices: {e}")
         return {}
 
 
+async def _generate_choices_for_batches(batches):
+    """Fan batches out to the API, MCQ_CONCURRENCY requests in flight."""
+    async_client = anthropic.AsyncAnthropic()
+    sem = asyncio.Semaphore(MCQ_CONCURRENCY)
+
+    async def run_batch(batch):
+        async with sem:
+            return await generate_mcq_choices_async(async_client, batch)
+
+    return await asyncio.gather(*[run_batch(batch) for batch in batches])
+
+
 def process_pdf(pdf_info, questions_db, topic_extractor, anthropic_client):
     """Process a single PDF: extract topics, generate questions, generate choices."""
     
@@ -210,43 +260,41 @@ def process_pdf(pdf_info, questions_db, topic_extractor, anthropic_client):
     
     # Step 3: Save questions to database with EXACT PDF FILENAME
     print(f"\n   💾 Step 3: Saving to database...")
-    saved_count = questions_db.add_questions_batch(
+    # The insert returns the rows with their IDs - no re-read of the
+    # table to pair questions back up
+    saved_questions = questions_db.add_questions_batch_with_ids(
         pdf_filename=filename,  # Use exact filename!
         questions=cards,
         source_name=source,
         week_tag=week
     )
+    saved_count = len(saved_questions)
     print(f"      Saved {saved_count} questions (tagged to: {filename})")
-    
+
     # Step 4: Generate MCQ choices
     print(f"\n   🎲 Step 4: Generating MCQ choices...")
     
-    # Get questions we just saved
-    saved_questions = questions_db.get_questions_for_pdf(filename)
-    
-    # Generate choices in batches
-    choices_generated = 0
-    for batch_start in range(0, len(saved_questions), BATCH_SIZE):
-        batch_end = min(batch_start + BATCH_SIZE, len(saved_questions))
-        batch = saved_questions[batch_start:batch_end]
-        
-        # Prepare for MCQ generation
-        batch_for_mcq = [{'question': q['question'], 'answer': q['answer']} for q in batch]
-        
-        results = generate_mcq_choices(anthropic_client, batch_for_mcq)
-        
-        # Save choices
+    # Generate choices with concurrent batches - the semaphore caps the
+    # requests in flight, replacing the old fixed sleep between batches
+    batches = [saved_questions[start:start + BATCH_SIZE]
+               for start in range(0, len(saved_questions), BATCH_SIZE)]
+    batch_results = asyncio.run(_generate_choices_for_batches([
+        [{'question': q['question'], 'answer': q['answer']} for q in batch]
+        for batch in batches
+    ]))
+
+    # Accumulate all choices and save once - one transaction per PDF
+    # instead of one commit per question
+    choice_rows = []
+    for batch_num, (batch, results) in enumerate(zip(batches, batch_results), start=1):
         for local_idx, choices_data in results.items():
             question = batch[local_idx]
-            questions_db.save_mcq_choices(
-                question_id=question['question_id'],
-                choices=choices_data['choices'],
-                correct_index=choices_data['correct_index']
-            )
-            choices_generated += 1
-        
-        print(f"      Batch {batch_start//BATCH_SIZE + 1}: {len(results)}/{len(batch)} choices generated")
-        time.sleep(0.5)  # Rate limiting
+            choice_rows.append((question['question_id'],
+                                choices_data['choices'],
+                                choices_data['correct_index']))
+        print(f"      Batch {batch_num}: {len(results)}/{len(batch)} choices generated")
+
+    choices_generated = questions_db.save_mcq_choices_bulk(choice_rows)
     
     print(f"\n   ✅ Complete: {saved_count} questions, {choices_generated} choices")
     return saved_count
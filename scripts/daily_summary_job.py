@@ -21,41 +21,47 @@ def main():
     """Send daily summary email."""
     log_file = project_root / 'logs' / 'daily_summary.log'
     log_file.parent.mkdir(exist_ok=True)
-    
+
+    # One buffered append fd for the whole run instead of
+    # open/write/close per log line
+    log_fh = open(log_file, 'a', buffering=8192)
+
     def log(message):
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         log_line = f"[{timestamp}] {message}"
         print(log_line)
-        with open(log_file, 'a') as f:
-            f.write(log_line + '\n')
-    
-    log("=" * 60)
-    log("Starting daily summary job")
-    
+        log_fh.write(log_line + '\n')
+
     try:
-        from server.calendar_db import CalendarDatabase
-        from server.email_service import DailySummaryService
-        
-        log("Initializing services...")
-        calendar_db = CalendarDatabase()
-        summary_service = DailySummaryService(calendar_db)
-        
-        log("Generating and sending summary...")
-        recipient = 'arvind@orchids.edu.in'
-        success = summary_service.generate_and_send_summary(recipient)
-        
-        if success:
-            log(f"✅ Daily summary sent successfully to {recipient}")
-        else:
-            log(f"❌ Failed to send daily summary to {recipient}")
-        
-        return 0 if success else 1
-        
-    except Exception as e:
-        log(f"❌ Error: {str(e)}")
-        import traceback
-        log(traceback.format_exc())
-        return 1
+        log("=" * 60)
+        log("Starting daily summary job")
+
+        try:
+            from server.calendar_db import CalendarDatabase
+            from server.email_service import DailySummaryService
+
+            log("Initializing services...")
+            calendar_db = CalendarDatabase()
+            summary_service = DailySummaryService(calendar_db)
+
+            log("Generating and sending summary...")
+            recipient = 'arvind@orchids.edu.in'
+            success = summary_service.generate_and_send_summary(recipient)
+
+            if success:
+                log(f"✅ Daily summary sent successfully to {recipient}")
+            else:
+                log(f"❌ Failed to send daily summary to {recipient}")
+
+            return 0 if success else 1
+
+        except Exception as e:
+            log(f"❌ Error: {str(e)}")
+            import traceback
+            log(traceback.format_exc())
+            return 1
+    finally:
+        log_fh.close()
 
 
 if __name__ == '__main__':
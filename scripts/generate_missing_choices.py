@@ -4,7 +4,9 @@ One-time script to generate MCQ choices for all questions that don't have them.
 This will make all future tests instant (no on-demand generation).
 """
 
+import asyncio
 import os
+import random
 import sys
 import json
 import time
@@ -16,20 +18,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import anthropic
 from server.questions_db import QuestionsDatabase
 
-def generate_choices_batch(client, questions: list) -> dict:
-    """Generate MCQ choices for a batch of questions using Claude API."""
-    
-    # Prepare batch prompt
-    questions_text = []
-    for i, q in enumerate(questions):
-        questions_text.append(f"""[Question {i+1}]
-Question: {q['question']}
-Correct Answer: {q['answer']}
-""")
+MODEL = "claude-3-5-haiku-20241022"  # Faster model for simple distractor generation
+BATCH_POLL_SECONDS = 30
+ASYNC_CONCURRENCY = 10  # Fallback path: concurrent requests in flight
+ASYNC_MAX_RETRIES = 5
 
-    prompt = f"""You are an expert at creating multiple choice questions for CLAT (Common Law Admission Test) General Knowledge preparation.
+DISTRACTOR_PROMPT = """You are an expert at creating multiple choice questions for CLAT (Common Law Admission Test) General Knowledge preparation.
 
-Given the following questions with their correct answers, generate 3 plausible but INCORRECT answer choices (distractors) for each question.
+Given the following question with its correct answer, generate 3 plausible but INCORRECT answer choices (distractors).
 
 Guidelines:
 - Distractors should be plausible but clearly wrong
@@ -39,57 +35,145 @@ Guidelines:
 - For dates: use nearby dates or related events
 - For places: use other locations in same category
 
-Questions:
-{''.join(questions_text)}
+Question: {question}
+Correct Answer: {answer}
+
+Return ONLY a JSON object:
+{{"distractors": ["wrong1", "wrong2", "wrong3"]}}
+
+No markdown, no explanation - just the JSON object."""
+
+
+def _build_choices(distractors: list, correct_answer: str) -> dict:
+    """Mix the correct answer into the distractors at a random position."""
+    # One RNG draw and a direct insert - no shuffle, no .index() scan
+    correct_index = random.randrange(4)
+    choices = distractors[:3]
+    choices.insert(correct_index, correct_answer)
+    return {
+        'choices': choices,
+        'correct_index': correct_index
+    }
+
+
+def _parse_distractor_response(response_text: str) -> list:
+    """Extract the distractor list from a model response."""
+    response_text = response_text.strip()
+    # Clean markdown if present
+    if response_text.startswith('```'):
+        lines = response_text.split('\n')
+        response_text = '\n'.join(lines[1:-1] if lines[-1] == '```' else lines[1:])
+    return json.loads(response_text).get('distractors', [])
+
 
-Return ONLY a JSON array with one object per question:
-[
-  {{"question_index": 1, "distractors": ["wrong1", "wrong2", "wrong3"]}},
-  ...
-]
+def generate_choices_via_batch_api(client, questions: list) -> dict:
+    """Generate choices for all questions through the Message Batches API.
 
-No markdown, no explanation - just the JSON array."""
+    One batch job instead of thousands of synchronous calls: per-request
+    round-trip latency disappears and batch pricing is half the
+    synchronous rate. custom_id carries the question_id, so results map
+    straight back without index bookkeeping.
+
+    Returns {question_id: {'choices': [...], 'correct_index': n}}.
+    """
+    answers_by_id = {str(q['question_id']): q['answer'] for q in questions}
+
+    batch = client.messages.batches.create(requests=[
+        {
+            "custom_id": str(q['question_id']),
+            "params": {
+                "model": MODEL,
+                "max_tokens": 1024,
+                "messages": [{
+                    "role": "user",
+                    "content": DISTRACTOR_PROMPT.format(
+                        question=q['question'], answer=q['answer'])
+                }]
+            }
+        }
+        for q in questions
+    ])
+    print(f"   Submitted batch {batch.id} ({len(questions)} requests)")
+
+    while batch.processing_status != "ended":
+        time.sleep(BATCH_POLL_SECONDS)
+        batch = client.messages.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        print(f"   [{batch.processing_status}] "
+              f"{counts.succeeded} succeeded, {counts.errored} errored, "
+              f"{counts.processing} processing")
+
+    output = {}
+    for result in client.messages.batches.results(batch.id):
+        if result.result.type != "succeeded":
+            continue
+        answer = answers_by_id.get(result.custom_id)
+        if answer is None:
+            continue
+        try:
+            distractors = _parse_distractor_response(
+                result.result.message.content[0].text)
+        except (json.JSONDecodeError, IndexError) as e:
+            print(f"    ❌ Bad response for question {result.custom_id}: {e}")
+            continue
+        if len(distractors) >= 3:
+            output[int(result.custom_id)] = _build_choices(distractors, answer)
+
+    return output
+
+
+async def _generate_one_async(client, sem, question):
+    """Fetch distractors for one question with backoff on rate limits."""
+    async with sem:
+        delay = 1.0
+        for attempt in range(ASYNC_MAX_RETRIES):
+            try:
+                message = await client.messages.create(
+                    model=MODEL,
+                    max_tokens=1024,
+                    messages=[{
+                        "role": "user",
+                        "content": DISTRACTOR_PROMPT.format(
+                            question=question['question'],
+                            answer=question['answer'])
+                    }]
+                )
+                break
+            except anthropic.RateLimitError:
+                # Exponential backoff with jitter
+                await asyncio.sleep(delay + random.random())
+                delay *= 2
+            except Exception as e:
+                print(f"    ❌ Error for question {question['question_id']}: {e}")
+                return None
+        else:
+            print(f"    ❌ Rate-limited out for question {question['question_id']}")
+            return None
 
     try:
-        message = client.messages.create(
-            model="claude-3-5-haiku-20241022",  # Faster model for simple distractor generation
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        response_text = message.content[0].text.strip()
-        
-        # Clean markdown if present
-        if response_text.startswith('```'):
-            lines = response_text.split('\n')
-            response_text = '\n'.join(lines[1:-1] if lines[-1] == '```' else lines[1:])
-        
-        results = json.loads(response_text)
-        
-        # Process results
-        output = {}
-        for item in results:
-            idx = item.get('question_index', 0) - 1  # Convert to 0-indexed
-            if 0 <= idx < len(questions):
-                distractors = item.get('distractors', [])
-                if len(distractors) >= 3:
-                    # Create choices with correct answer at random position
-                    import random
-                    correct_answer = questions[idx]['answer']
-                    choices = distractors[:3] + [correct_answer]
-                    random.shuffle(choices)
-                    correct_index = choices.index(correct_answer)
-                    
-                    output[idx] = {
-                        'choices': choices,
-                        'correct_index': correct_index
-                    }
-        
-        return output
-        
-    except Exception as e:
-        print(f"    ❌ Error generating choices: {e}")
-        return {}
+        distractors = _parse_distractor_response(message.content[0].text)
+    except (json.JSONDecodeError, IndexError) as e:
+        print(f"    ❌ Bad response for question {question['question_id']}: {e}")
+        return None
+    if len(distractors) < 3:
+        return None
+    return question['question_id'], _build_choices(distractors, question['answer'])
+
+
+async def _generate_choices_concurrently(questions: list) -> dict:
+    """Fallback to concurrent synchronous-style requests.
+
+    Used when the Batches API isn't available (e.g. older SDK): a
+    semaphore keeps ASYNC_CONCURRENCY requests in flight instead of the
+    old one-at-a-time loop. Results are returned to the caller and
+    written to SQLite from the main thread.
+    """
+    client = anthropic.AsyncAnthropic()
+    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    results = await asyncio.gather(*[
+        _generate_one_async(client, sem, q) for q in questions
+    ])
+    return dict(r for r in results if r is not None)
 
 
 def main():
@@ -109,12 +193,22 @@ def main():
     
     # Get questions without choices
     conn = questions_db._get_connection()
+    # Bulk-backfill run: WAL + relaxed sync so the save phase pays one
+    # fsync per commit instead of full-durability journaling
+    conn.executescript(
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+    )
     cursor = conn.cursor()
     
+    # Anti-join via LEFT JOIN + IS NULL: walks idx_question_choices_qid
+    # per row instead of re-evaluating a NOT IN subquery
     cursor.execute("""
         SELECT q.question_id, q.question_text, q.answer_text, q.category, q.pdf_filename
         FROM questions q
-        WHERE q.question_id NOT IN (SELECT question_id FROM question_choices)
+        LEFT JOIN question_choices qc ON q.question_id = qc.question_id
+        WHERE qc.question_id IS NULL
         ORDER BY q.question_id
     """)
     
@@ -127,67 +221,38 @@ def main():
             'category': row['category'],
             'pdf_filename': row['pdf_filename']
         })
-    
-    conn.close()
-    
+
     total = len(questions_without_choices)
     print(f"\n📊 Found {total} questions without choices")
     
     if total == 0:
         print("✅ All questions already have choices!")
+        conn.close()
         return
     
-    # Process in batches - LARGER batches = FASTER
-    batch_size = 25  # Increased from 10 to 25
-    processed = 0
-    success = 0
-    failed = 0
-    
-    print(f"\n⏱️  Processing in batches of {batch_size} (optimized for speed)...")
-    print(f"   Estimated time: {(total // batch_size) * 4} seconds\n")
-    
+    # Submit everything as one Message Batches job; fall back to
+    # concurrent per-question requests if batch submission isn't possible
+    print(f"\n⏱️  Submitting all {total} questions as one batch job...")
+
     start_time = time.time()
-    
-    for batch_start in range(0, total, batch_size):
-        batch_end = min(batch_start + batch_size, total)
-        batch = questions_without_choices[batch_start:batch_end]
-        
-        print(f"📦 Batch {batch_start//batch_size + 1}/{(total + batch_size - 1)//batch_size}: Questions {batch_start+1}-{batch_end}")
-        
-        results = generate_choices_batch(client, batch)
-        
-        # Save results
-        for local_idx, choices_data in results.items():
-            question = batch[local_idx]
-            question_id = question['question_id']
-            
-            saved = questions_db.save_mcq_choices(
-                question_id=question_id,
-                choices=choices_data['choices'],
-                correct_index=choices_data['correct_index']
-            )
-            
-            if saved:
-                success += 1
-            else:
-                failed += 1
-        
-        batch_failed = len(batch) - len(results)
-        failed += batch_failed
-        
-        processed += len(batch)
-        
-        # Progress
-        elapsed = time.time() - start_time
-        rate = processed / elapsed if elapsed > 0 else 0
-        remaining = (total - processed) / rate if rate > 0 else 0
-        
-        print(f"   ✅ Generated: {len(results)}/{len(batch)} | Total: {success}/{processed} | ETA: {int(remaining)}s")
-        
-        # Rate limiting - minimal delay (Claude API handles its own rate limits)
-        if batch_end < total:
-            time.sleep(0.5)
-    
+
+    try:
+        results = generate_choices_via_batch_api(client, questions_without_choices)
+    except (AttributeError, anthropic.APIError) as e:
+        print(f"   ⚠️ Batch API unavailable ({e}); falling back to concurrent requests")
+        results = asyncio.run(_generate_choices_concurrently(questions_without_choices))
+
+    # Save all results in one transaction - fsync cost is per-commit,
+    # not per-row, so this beats a commit per question by orders of
+    # magnitude on large backfills
+    choice_rows = [
+        (question_id, choices_data['choices'], choices_data['correct_index'])
+        for question_id, choices_data in results.items()
+    ]
+    success = questions_db.save_mcq_choices_bulk(choice_rows)
+    failed = total - success
+
+    processed = total
     elapsed_total = time.time() - start_time
     
     print("\n" + "=" * 60)
@@ -200,10 +265,11 @@ def main():
     print(f"   Rate: {processed/elapsed_total:.1f} questions/second")
     print("=" * 60)
     
-    # Verify
-    cursor = questions_db._get_connection().cursor()
+    # Verify on the connection opened at the start - no second sqlite
+    # open just for a COUNT
     cursor.execute("SELECT COUNT(*) FROM question_choices")
     final_count = cursor.fetchone()[0]
+    conn.close()
     print(f"\n✅ Total questions with choices now: {final_count}")
 
 
@@ -4,6 +4,7 @@ Run at 6:00 PM IST (Mon-Fri) after market close via systemd timer.
 
 On GCP VM: systemd timer runs at 12:30 UTC (6:00 PM IST)
 """
+import argparse
 import sys
 from datetime import datetime, date
 from pathlib import Path
@@ -15,8 +16,9 @@ sys.path.insert(0, str(script_dir))
 from server.momentum_db import MomentumDatabase
 from server.momentum_scanner import MomentumScanner
 
-# NSE holidays for 2026 (source: NSE website)
-NSE_HOLIDAYS_2026 = {
+# NSE holidays for 2026 (source: NSE website) - frozen: this is a
+# lookup table, not something callers should mutate
+NSE_HOLIDAYS_2026 = frozenset({
     date(2026, 1, 26),   # Republic Day
     date(2026, 2, 17),   # Mahashivratri (tentative)
     date(2026, 3, 10),   # Holi
@@ -37,7 +39,7 @@ NSE_HOLIDAYS_2026 = {
     date(2026, 11, 10),  # Diwali (Balipratipada)
     date(2026, 11, 27),  # Guru Nanak Jayanti
     date(2026, 12, 25),  # Christmas
-}
+})
 
 
 def is_market_holiday(d=None):
@@ -53,7 +55,21 @@ def is_market_holiday(d=None):
     return False, ""
 
 
+def default_db_path():
+    """Pick the GCP path when it exists, otherwise the local dev path."""
+    # GCP: /opt/speedmathsgames/server/momentum_tracker.db
+    # Local: ~/clat_preparation/momentum_tracker.db
+    gcp_db = Path('/opt/speedmathsgames/server/momentum_tracker.db')
+    local_db = Path.home() / 'clat_preparation' / 'momentum_tracker.db'
+    return str(gcp_db if gcp_db.exists() else local_db)
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Daily momentum scanner cron job')
+    parser.add_argument('--db-path', default=None,
+                        help='Momentum tracker DB path (default: auto-detect GCP vs local)')
+    args = parser.parse_args()
+
     today = date.today()
     is_holiday, reason = is_market_holiday(today)
 
@@ -61,12 +77,7 @@ def main():
         print(f'[{datetime.now()}] Skipping scan: {reason} ({today})')
         return
 
-    # Determine DB path
-    # GCP: /opt/speedmathsgames/server/momentum_tracker.db
-    # Local: ~/clat_preparation/momentum_tracker.db
-    gcp_db = Path('/opt/speedmathsgames/server/momentum_tracker.db')
-    local_db = Path.home() / 'clat_preparation' / 'momentum_tracker.db'
-    db_path = str(gcp_db if gcp_db.exists() else local_db)
+    db_path = args.db_path or default_db_path()
 
     start = datetime.now()
     print(f'\n[{start}] Starting daily momentum scan...')
@@ -75,8 +86,16 @@ def main():
     db = MomentumDatabase(db_path)
     scanner = MomentumScanner(db)
 
+    # Log at most once per 5% of progress - per-symbol updates would
+    # dominate the log (and, when redirected to a file, the syscall
+    # count) on a full-universe scan
+    last_pct = [-1]
+
     def log_progress(update):
-        print(f"  [{update.get('percent', 0)}%] {update['message']}")
+        pct = update.get('percent', 0)
+        if pct - last_pct[0] >= 5 or update.get('type') == 'complete':
+            print(f"  [{pct}%] {update['message']}")
+            last_pct[0] = pct
 
     results = scanner.run_full_scan(progress_callback=log_progress)
 
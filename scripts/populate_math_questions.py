@@ -4,11 +4,13 @@ Populate math questions database with 60 questions per topic (20 per difficulty)
 Uses Anthropic API to generate high-quality math questions.
 """
 
+import asyncio
 import os
+import random
 import sys
 import json
-import time
 from pathlib import Path
+from types import SimpleNamespace
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -29,19 +31,116 @@ TOPICS = {
 DIFFICULTIES = ['easy', 'medium', 'hard']
 QUESTIONS_PER_BATCH = 10
 TARGET_PER_DIFFICULTY = 20  # 20 per difficulty × 3 = 60 per topic
+API_CONCURRENCY = 5  # Concurrent generation requests in flight
 
-def generate_questions(client, topic: str, topic_desc: str, difficulty: str, count: int) -> list:
-    """Generate math questions using Claude."""
-    
-    difficulty_guide = {
-        'easy': 'simple problems suitable for grade 5-6, single step calculations',
-        'medium': 'moderate problems for grade 7-8, may require 2-3 steps',
-        'hard': 'challenging problems for grade 9-10, multi-step with reasoning'
-    }
-    
-    prompt = f"""Generate exactly {count} {difficulty} difficulty math questions on {topic_desc}.
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+
+# LLM_BACKEND=ollama generates against a local model instead of the
+# Anthropic API - no per-token cost and no remote rate limit for this
+# one-shot data-prep job
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'anthropic')
+OLLAMA_URL = os.environ.get('OLLAMA_URL', 'http://localhost:11434/api/chat')
+OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL', 'llama3.1:8b')
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+class OllamaClient:
+    """Anthropic-shaped wrapper around a local Ollama server.
+
+    Exposes the same client.messages.create coroutine surface the
+    generation code uses, so switching backends never touches the call
+    sites. format='json' asks Ollama to constrain output to valid JSON.
+    """
+
+    class _Messages:
+        async def create(self, model=None, max_tokens=None, messages=None, **_):
+            import requests
+
+            def post():
+                resp = requests.post(OLLAMA_URL, json={
+                    'model': OLLAMA_MODEL,
+                    'messages': messages,
+                    'stream': False,
+                    'format': 'json',
+                }, timeout=300)
+                resp.raise_for_status()
+                return resp.json()
+
+            data = await asyncio.to_thread(post)
+            text = data.get('message', {}).get('content', '')
+            return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    def __init__(self):
+        self.messages = self._Messages()
+
+
+def parse_json_payload(text: str):
+    """Decode the first JSON object/array embedded in a model response.
+
+    raw_decode stops at the end of the first complete value, so stray
+    prose or markdown fences around the JSON no longer break parsing -
+    the fragile split-on-fence approach cost a full API round-trip
+    whenever the model added trailing text.
+    """
+    start = min((i for i in (text.find('{'), text.find('[')) if i != -1),
+                default=-1)
+    if start == -1:
+        raise json.JSONDecodeError('no JSON payload found', text, 0)
+    obj, _ = _JSON_DECODER.raw_decode(text, start)
+    return obj
+
+DIFFICULTY_GUIDE = {
+    'easy': 'simple problems suitable for grade 5-6, single step calculations',
+    'medium': 'moderate problems for grade 7-8, may require 2-3 steps',
+    'hard': 'challenging problems for grade 9-10, multi-step with reasoning'
+}
+
+
+async def call_with_backoff(fn, **kwargs):
+    """Call an API coroutine, retrying 429/5xx with exponential backoff.
+
+    Honors the retry-after header when the API sends one, otherwise
+    sleeps base * 2**attempt plus jitter so concurrent slots don't
+    retry in lockstep. Other errors propagate to the caller.
+    """
+    for attempt in range(MAX_RETRIES):
+        try:
+            return await fn(**kwargs)
+        except (anthropic.RateLimitError, anthropic.APIStatusError) as e:
+            status = getattr(e, 'status_code', 0)
+            if status not in (429,) and status < 500:
+                raise
+            if attempt == MAX_RETRIES - 1:
+                raise
+            retry_after = None
+            response = getattr(e, 'response', None)
+            if response is not None:
+                retry_after = response.headers.get('retry-after')
+            if retry_after:
+                delay = float(retry_after)
+            else:
+                delay = BACKOFF_BASE_SECONDS * 2 ** attempt + random.uniform(0, 0.25)
+            print(f"    ⏳ API {status}, retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+
+async def generate_topic_pack(client, topic: str, topic_desc: str,
+                              counts: dict) -> dict:
+    """Generate questions for every difficulty of a topic in one call.
+
+    One fused request per topic instead of one per difficulty: same
+    tokens generated, a third of the round-trips. Returns
+    {difficulty: [question dicts]} for whatever the model delivered.
+    """
+    breakdown = ', '.join(f"{n} {d}" for d, n in counts.items())
+    guide = '\n'.join(f"- {d}: {DIFFICULTY_GUIDE[d]}" for d in counts)
+
+    prompt = f"""Generate math questions on {topic_desc}: {breakdown}.
 
-Difficulty level: {difficulty_guide[difficulty]}
+Difficulty levels:
+{guide}
 
 For EACH question provide a JSON object with these exact fields:
 - question_text: The math question (clear and concise)
@@ -50,103 +149,145 @@ For EACH question provide a JSON object with these exact fields:
 - correct_choice: Which letter is correct (A, B, C, or D)
 - explanation: Brief explanation of the solution
 
-Return ONLY a valid JSON array of {count} question objects. No markdown, no extra text."""
+Return ONLY a valid JSON object mapping each requested difficulty to its
+array of question objects, e.g. {{"easy": [...], "medium": [...]}}.
+No markdown, no extra text."""
 
     try:
-        response = client.messages.create(
+        response = await call_with_backoff(
+            client.messages.create,
             model="claude-sonnet-4-20250514",
-            max_tokens=4096,
+            max_tokens=8192,
             messages=[{"role": "user", "content": prompt}]
         )
-        
-        text = response.content[0].text.strip()
-        
-        # Clean markdown if present
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
-        
-        questions = json.loads(text)
-        return questions if isinstance(questions, list) else []
-        
+
+        pack = parse_json_payload(response.content[0].text)
+        if not isinstance(pack, dict):
+            return {}
+        return {d: qs for d, qs in pack.items() if isinstance(qs, list)}
+
     except Exception as e:
         print(f"    ❌ Error generating: {e}")
-        return []
+        return {}
+
+
+async def generate_for_topic(client, sem, topic: str, topic_desc: str,
+                             needed: dict) -> dict:
+    """Fill every difficulty slot of a topic via fused pack requests.
+
+    Rounds within a topic run sequentially (each retries until it
+    returns something), but topics run concurrently under the shared
+    semaphore.
+    """
+    collected = {d: [] for d in needed}
+    remaining = dict(needed)
+    attempts = 0
+    max_attempts = sum(needed.values())
+    while any(remaining.values()) and attempts < max_attempts:
+        counts = {d: min(QUESTIONS_PER_BATCH, r)
+                  for d, r in remaining.items() if r > 0}
+        async with sem:
+            pack = await generate_topic_pack(client, topic, topic_desc, counts)
+        attempts += 1
+        if not pack:
+            print(f"    ⚠️ {topic}: no questions returned, retrying...")
+            await asyncio.sleep(2)
+            continue
+        for difficulty, questions in pack.items():
+            if remaining.get(difficulty, 0) > 0:
+                take = questions[:remaining[difficulty]]
+                collected[difficulty].extend(take)
+                remaining[difficulty] -= len(take)
+        done = sum(len(v) for v in collected.values())
+        print(f"    {topic}: {done}/{sum(needed.values())} generated")
+    return collected
 
 def main():
-    # Check API key
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        print("❌ ANTHROPIC_API_KEY not set!")
-        print("Run: source ~/.zshrc")
-        sys.exit(1)
-    
-    client = anthropic.Anthropic(api_key=api_key)
     db = MathDatabase()
-    
+
     print("\n" + "="*60)
     print("🧮 Math Questions Generator")
     print("="*60)
-    
+
     # Check current counts
     stats = db.get_database_stats()
     print(f"\nCurrent questions: {stats['total_questions']}")
     for topic, count in stats.get('by_topic', {}).items():
         print(f"  {topic}: {count}")
-    
+
     total_added = 0
-    
+
+    # Figure out what each topic still needs per difficulty from one
+    # grouped count, then run all topics concurrently - wall time
+    # becomes the slowest topic instead of the sum of all of them
+    grid = db.count_by_topic_difficulty()
+    slots = []
     for topic, topic_desc in TOPICS.items():
-        print(f"\n📚 Topic: {topic.upper()}")
-        
+        needed = {}
         for difficulty in DIFFICULTIES:
-            # Check how many we already have
-            current = db.count_questions(topic=topic, difficulty=difficulty)
-            needed = max(0, TARGET_PER_DIFFICULTY - current)
-            
-            if needed == 0:
-                print(f"  ✅ {difficulty}: Already have {current} questions")
-                continue
-            
-            print(f"  🔄 {difficulty}: Have {current}, generating {needed} more...")
-            
-            # Generate in batches
-            generated = 0
-            while generated < needed:
-                batch_size = min(QUESTIONS_PER_BATCH, needed - generated)
-                questions = generate_questions(client, topic, topic_desc, difficulty, batch_size)
-                
-                if not questions:
-                    print(f"    ⚠️ No questions returned, retrying...")
-                    time.sleep(2)
-                    continue
-                
-                # Add to database
-                for q in questions:
-                    try:
-                        db.add_question(
-                            topic=topic,
-                            difficulty=difficulty,
-                            question_text=q.get('question_text', ''),
-                            correct_answer=str(q.get('correct_answer', '')),
-                            choices={
-                                'A': str(q.get('choice_a', '')),
-                                'B': str(q.get('choice_b', '')),
-                                'C': str(q.get('choice_c', '')),
-                                'D': str(q.get('choice_d', ''))
-                            },
-                            correct_choice=q.get('correct_choice', 'A'),
-                            explanation=q.get('explanation', '')
-                        )
-                        generated += 1
-                        total_added += 1
-                    except Exception as e:
-                        print(f"    ⚠️ Error adding question: {e}")
-                
-                print(f"    Added {len(questions)} questions ({generated}/{needed})")
-                time.sleep(1)  # Rate limiting
-    
+            current = grid.get((topic, difficulty), 0)
+            missing = max(0, TARGET_PER_DIFFICULTY - current)
+            if missing == 0:
+                print(f"  ✅ {topic}/{difficulty}: Already have {current} questions")
+            else:
+                print(f"  🔄 {topic}/{difficulty}: Have {current}, generating {missing} more...")
+                needed[difficulty] = missing
+        if needed:
+            slots.append((topic, topic_desc, needed))
+
+    if not slots:
+        # Nothing to generate - don't bother constructing an API client
+        print("\n✅ All topic/difficulty buckets are full. Nothing to do.")
+        db.close()
+        return
+
+    if LLM_BACKEND == 'ollama':
+        client = OllamaClient()
+    else:
+        # Check API key
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            print("❌ ANTHROPIC_API_KEY not set!")
+            print("Run: source ~/.zshrc")
+            sys.exit(1)
+        client = anthropic.AsyncAnthropic(api_key=api_key)
+
+    async def run_generation():
+        sem = asyncio.Semaphore(API_CONCURRENCY)
+        return await asyncio.gather(*[
+            generate_for_topic(client, sem, topic, topic_desc, needed)
+            for topic, topic_desc, needed in slots
+        ])
+
+    results = asyncio.run(run_generation())
+
+    # Save from the main thread - the API fan-out never touches
+    # sqlite. One bulk insert for the whole run: a single
+    # transaction and fsync instead of one commit per question.
+    rows = [
+        {
+            'topic': topic,
+            'difficulty': difficulty,
+            'question_text': q.get('question_text', ''),
+            'correct_answer': str(q.get('correct_answer', '')),
+            'choices': {
+                'A': str(q.get('choice_a', '')),
+                'B': str(q.get('choice_b', '')),
+                'C': str(q.get('choice_c', '')),
+                'D': str(q.get('choice_d', ''))
+            },
+            'correct_choice': q.get('correct_choice', 'A'),
+            'explanation': q.get('explanation', '')
+        }
+        for (topic, _, _), pack in zip(slots, results)
+        for difficulty, questions in pack.items()
+        for q in questions
+    ]
+    try:
+        total_added = db.add_questions_bulk(rows)
+    except Exception as e:
+        print(f"    ⚠️ Error adding questions: {e}")
+
     # Final stats
     print("\n" + "="*60)
     print("📊 Final Statistics")
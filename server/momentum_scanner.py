@@ -6,7 +6,9 @@ Uses tradingview-screener for instant bulk data (3000+ stocks in one API call).
 Uses yfinance as fallback for VCP historical candle analysis on qualifying stocks only.
 """
 
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from datetime import datetime
 
@@ -81,8 +83,13 @@ class MomentumScanner:
         'is_primary',
     ]
 
-    def __init__(self, db: MomentumDatabase = None):
+    def __init__(self, db: MomentumDatabase = None, max_workers: int = None):
         self.db = db or MomentumDatabase()
+        # Concurrent yfinance downloads for VCP history; the worker cap
+        # doubles as the rate limiter (SCAN_WORKERS env overrides)
+        if max_workers is None:
+            max_workers = int(os.environ.get('SCAN_WORKERS', 8))
+        self.max_workers = max_workers
 
     def fetch_screener_data(self, min_market_cap: float = 1_000_000_000,
                             progress_callback=None) -> pd.DataFrame:
@@ -547,13 +554,34 @@ class MomentumScanner:
         vcp_check_list = vcp_eligible[:100]  # Top 100 by RS rating
 
         if HAS_YFINANCE and vcp_check_list:
-            for i, stock in enumerate(vcp_check_list):
-                symbol = stock['symbol']
+            # Resolve exchanges up front so the downloads are pure fetches
+            exchanges = []
+            for stock in vcp_check_list:
                 exchange = 'NSE'  # Default; could parse from ticker
                 # Determine exchange from the qualifying_df
-                match = qualifying_df[qualifying_df['symbol'] == symbol]
+                match = qualifying_df[qualifying_df['symbol'] == stock['symbol']]
                 if not match.empty:
                     exchange = match.iloc[0].get('exchange_code', 'NSE')
+                exchanges.append(exchange)
+
+            if progress_callback:
+                progress_callback({
+                    'type': 'progress',
+                    'message': f'Downloading history for {len(vcp_check_list)} stocks '
+                               f'({self.max_workers} workers)...',
+                    'percent': 60
+                })
+
+            # Download OHLCV concurrently — the calls are network-bound,
+            # so overlapping them is a near-linear win up to the worker
+            # cap. Detection and DB writes stay on this thread.
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                ohlcv_list = list(executor.map(
+                    self.fetch_historical_for_vcp,
+                    [s['symbol'] for s in vcp_check_list], exchanges))
+
+            for i, (stock, ohlcv) in enumerate(zip(vcp_check_list, ohlcv_list)):
+                symbol = stock['symbol']
 
                 if progress_callback and i % 5 == 0:
                     pct = 60 + int((i / max(len(vcp_check_list), 1)) * 35)
@@ -563,7 +591,6 @@ class MomentumScanner:
                         'percent': pct
                     })
 
-                ohlcv = self.fetch_historical_for_vcp(symbol, exchange)
                 if ohlcv is None:
                     continue
 
@@ -586,10 +613,6 @@ class MomentumScanner:
                         breakouts.append(breakout)
                         self.db.save_breakout(breakout)
 
-                # Small delay between yfinance calls
-                if i % 10 == 9:
-                    time.sleep(0.5)
-
         duration = time.time() - start_time
         self.db.update_scan(scan_id, len(qualifying), duration)
 
@@ -13,14 +13,34 @@ CROSS-MACHINE COMPATIBILITY:
   and Mac Mini (/Users/arvindkumar) without path conflicts.
 """
 
+import itertools
 import os
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import re
 from typing import List, Dict, Optional
 import json
 
+# How long a scan result stays fresh. get_statistics and the filter_*
+# helpers all trigger scans back-to-back when the dashboard loads; within
+# this window they share one result instead of re-globbing and re-querying.
+SCAN_CACHE_TTL_SECONDS = 5
+
+# Filename date patterns, compiled once at import. re.search with string
+# literals relies on re's global pattern cache, which can be evicted
+# mid-scan; compiled patterns make the per-filename cost a plain match.
+_DATE_ISO = re.compile(r'\d{4}-\d{2}-\d{2}')
+_DATE_MONTH = re.compile(r'(\d{4})_(\w+)_(\d{1,2})')
+
+MONTH_MAP = {
+    'january': '01', 'february': '02', 'march': '03', 'april': '04',
+    'may': '05', 'june': '06', 'july': '07', 'august': '08',
+    'september': '09', 'october': '10', 'november': '11', 'december': '12'
+}
+
 
 def path_to_relative(absolute_path: str) -> str:
     """
@@ -105,11 +125,96 @@ class PDFScanner:
             }
         }
 
+        # One connection per scanner instance instead of a fresh
+        # connect/close per scan_folder call. WAL lets the dashboard's
+        # concurrent reads proceed alongside the tracked-PDF writes, and
+        # busy_timeout replaces immediate SQLITE_BUSY errors.
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA busy_timeout=5000;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-20000;"
+        )
+
+        # Covering indexes for the bulk scan queries: topic counts and
+        # categories resolve as index-only scans instead of full-table
+        # scans per folder. Tables are created by other modules, so each
+        # statement is tolerated failing (e.g. brand-new database).
+        for index_sql in (
+            "CREATE INDEX IF NOT EXISTS idx_topics_source_date "
+            "ON topics(source_date, category, topic_id)",
+            "CREATE INDEX IF NOT EXISTS idx_pdfs_filename ON pdfs(filename)",
+            "CREATE INDEX IF NOT EXISTS idx_pvs_pdf_id "
+            "ON pdf_view_sessions(pdf_id, started_at, completed_at)",
+            "CREATE INDEX IF NOT EXISTS idx_prr_pdf_id "
+            "ON pdf_revision_records(pdf_id, timestamp)",
+        ):
+            try:
+                self.conn.execute(index_sql)
+            except sqlite3.OperationalError:
+                pass
+        self.conn.commit()
+
+        # Assessment DB is optional (may not exist yet) - connect lazily
+        self._assessment_conn = None
+        self._assessment_conn_failed = False
+
+        # Short-TTL scan cache: (folder mtimes) -> last scan result.
+        # Invalidated automatically when any folder's mtime changes
+        # (a PDF added/removed touches the directory mtime).
+        self._scan_cache = None
+        self._scan_cache_key = None
+        self._scan_cache_ts = 0.0
+
         # Log paths at initialization for debugging
         print(f"📁 PDFScanner initialized: BASE_PATH={self.BASE_PATH} (exists={self.BASE_PATH.exists()})")
 
+    def _get_assessment_conn(self) -> Optional[sqlite3.Connection]:
+        """Lazily open (and keep) a connection to assessment_tracker.db."""
+        if self._assessment_conn is None and not self._assessment_conn_failed:
+            try:
+                self._assessment_conn = sqlite3.connect(
+                    str(Path(__file__).parent / "assessment_tracker.db"),
+                    check_same_thread=False)
+                self._assessment_conn.execute("PRAGMA busy_timeout=5000")
+            except sqlite3.Error:
+                self._assessment_conn_failed = True
+        return self._assessment_conn
+
+    def close(self):
+        """Close the scanner's database connections."""
+        if self._assessment_conn is not None:
+            self._assessment_conn.close()
+            self._assessment_conn = None
+        self.conn.close()
+
+    def _scan_cache_current_key(self) -> tuple:
+        """Cache key covering every folder's existence and mtime."""
+        key = []
+        for folder_info in self.FOLDERS.values():
+            path = folder_info['path']
+            try:
+                key.append((str(path), path.stat().st_mtime))
+            except OSError:
+                key.append((str(path), None))
+        return tuple(key)
+
     def scan_all_folders(self) -> Dict:
-        """Scan all PDF folders and return organized data."""
+        """Scan all PDF folders and return organized data.
+
+        Results are memoized for SCAN_CACHE_TTL_SECONDS (keyed by folder
+        mtimes) so the dashboard's burst of statistics + filter calls
+        only pays for one real scan.
+        """
+        now = time.time()
+        if (self._scan_cache is not None
+                and now - self._scan_cache_ts < SCAN_CACHE_TTL_SECONDS
+                and self._scan_cache_key == self._scan_cache_current_key()):
+            return self._scan_cache
+
         results = {
             'daily': [],
             'daily_drishti': [],
@@ -122,14 +227,21 @@ class PDFScanner:
             'scan_time': datetime.now().isoformat()
         }
 
-        for folder_key, folder_info in self.FOLDERS.items():
-            folder_path = folder_info['path']
-
-            if not folder_path.exists():
-                print(f"Warning: Folder not found: {folder_path}")
-                continue
+        # Folders are independent and the work is syscall/SQLite-bound
+        # (GIL released), so scan them concurrently. SQLite's default
+        # serialized threading mode keeps the shared connection safe.
+        # No exists() pre-flight: that's an extra stat per folder and a
+        # TOCTOU race - scan_folder already returns [] for a missing
+        # folder via its os.scandir error handling.
+        with ThreadPoolExecutor(max_workers=len(self.FOLDERS)) as pool:
+            futures = {
+                folder_key: pool.submit(self.scan_folder, folder_info['path'],
+                                        folder_info['type'], folder_info['source'])
+                for folder_key, folder_info in self.FOLDERS.items()
+            }
 
-            pdfs = self.scan_folder(folder_path, folder_info['type'], folder_info['source'])
+        for folder_key, folder_info in self.FOLDERS.items():
+            pdfs = futures[folder_key].result()
 
             if folder_info['type'] == 'daily':
                 results['daily'].extend(pdfs)
@@ -142,62 +254,167 @@ class PDFScanner:
 
             results['total_count'] += len(pdfs)
 
+        self._scan_cache = results
+        self._scan_cache_key = self._scan_cache_current_key()
+        self._scan_cache_ts = now
         return results
 
     def scan_folder(self, folder_path: Path, source_type: str, source_name: str) -> List[Dict]:
-        """Scan a single folder for PDFs."""
-        pdfs = []
+        """Scan a single folder for PDFs.
 
-        # Get all PDF files
-        pdf_files = list(folder_path.glob('*.pdf'))
+        Two-pass design: the first pass collects file metadata, then all
+        database lookups run as bulk GROUP BY queries (one per table
+        instead of several per PDF), and the second pass assembles the
+        per-PDF dicts from the prebuilt maps.
+        """
+        pdfs = []
 
-        # Get database connection for existing revision data
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        # --- Pass 1: collect file metadata ------------------------------
+        # os.scandir over Path.glob: DirEntry caches the stat from the
+        # directory read, so each PDF costs one syscall instead of the
+        # extra stat/lstat pathlib issues per entry.
+        entries = []  # (pdf_file, source_date, date_match, stat)
+        try:
+            with os.scandir(folder_path) as dir_iter:
+                for entry in dir_iter:
+                    # Skip tracked versions and non-PDFs by name first -
+                    # no Path object or stat for rejected entries
+                    if not entry.name.endswith('.pdf') or '_tracked' in entry.name:
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    date_match = self.extract_date_from_filename(entry.name)
+                    source_date = date_match if date_match else entry.name[:-4]
+                    entries.append((Path(entry.path), source_date, date_match,
+                                    entry.stat()))
+        except OSError:
+            # Folder missing or unreadable - same empty result glob gave
+            return pdfs
+
+        if not entries:
+            return pdfs
+
+        filenames = [e[0].name for e in entries]
+        source_dates = [e[1] for e in entries]
+
+        # Shared per-instance connection for existing revision data
+        conn = self.conn
         cursor = conn.cursor()
 
-        for pdf_file in pdf_files:
-            # Skip tracked versions
-            if '_tracked' in pdf_file.name:
-                continue
-
-            # Extract date from filename
-            date_match = self.extract_date_from_filename(pdf_file.name)
-
-            # Get file stats
-            stat = pdf_file.stat()
+        fn_marks = ','.join('?' * len(filenames))
+        sd_marks = ','.join('?' * len(source_dates))
+
+        # Topic counts and categories per source_date in one statement -
+        # SQLite aggregates both in C, and the categories (deck names)
+        # never contain commas so GROUP_CONCAT round-trips cleanly
+        topic_counts = {}
+        categories_map = {}
+        cursor.execute(f"""
+            SELECT source_date,
+                   COUNT(*) as total_topics,
+                   GROUP_CONCAT(DISTINCT category) as categories_csv
+            FROM topics
+            WHERE source_date IN ({sd_marks})
+            GROUP BY source_date
+        """, source_dates)
+        for row in cursor.fetchall():
+            topic_counts[row['source_date']] = row['total_topics']
+            csv = row['categories_csv']
+            categories_map[row['source_date']] = csv.split(',') if csv else []
+
+        # Tracked-PDF records by filename
+        cursor.execute(f"""
+            SELECT filename, last_modified, file_edit_count, view_count,
+                   date_added, extraction_attempted
+            FROM pdfs WHERE filename IN ({fn_marks})
+        """, filenames)
+        pdf_records = {row['filename']: row for row in cursor.fetchall()}
+
+        # View sessions: latest timestamp + count per pdf_id
+        # (MAX over COALESCE matches the old "newest session" lookup since
+        # completion timestamps only move forward)
+        view_map = {}
+        cursor.execute(f"""
+            SELECT pdf_id,
+                   MAX(COALESCE(completed_at, started_at)) as last_ts,
+                   COUNT(*) as cnt
+            FROM pdf_view_sessions
+            WHERE pdf_id IN ({fn_marks})
+            GROUP BY pdf_id
+        """, filenames)
+        for row in cursor.fetchall():
+            view_map[row['pdf_id']] = (row['last_ts'], row['cnt'])
+
+        # Annotations: latest timestamp per pdf_id
+        annotation_map = {}
+        try:
+            cursor.execute(f"""
+                SELECT pdf_id, MAX(timestamp) as last_ts, COUNT(*) as cnt
+                FROM pdf_revision_records
+                WHERE pdf_id IN ({fn_marks})
+                GROUP BY pdf_id
+            """, filenames)
+            for row in cursor.fetchall():
+                annotation_map[row['pdf_id']] = (row['last_ts'], row['cnt'])
+        except:
+            pass
+
+        # Assessment database: attempts and last passing test, one pass each
+        # Match on source_date (date format), pdf_id, or pdf_filename.
+        # Distinct session ids are kept per key so each PDF can count the
+        # union of its keys' sessions - a session is never double-counted
+        # when it matches on both date and filename, and filename-only
+        # sessions still count when date-keyed sessions exist.
+        attempt_sessions = {}
+        last_test_map = {}
+        try:
+            assessment_conn = self._get_assessment_conn()
+            assessment_cursor = assessment_conn.cursor()
+            assessment_cursor.execute(f"""
+                SELECT DISTINCT ts.session_id, ts.source_date, ts.pdf_id,
+                       ts.pdf_filename
+                FROM question_attempts qa
+                JOIN test_sessions ts ON qa.session_id = ts.session_id
+                WHERE ts.source_date IN ({sd_marks}) OR ts.pdf_id IN ({sd_marks})
+                   OR ts.pdf_filename IN ({fn_marks}) OR ts.source_date IN ({fn_marks})
+            """, source_dates + source_dates + filenames + filenames)
+            for sid, sd, pid, pfn in assessment_cursor.fetchall():
+                for key in (sd, pid, pfn):
+                    if key:
+                        attempt_sessions.setdefault(key, set()).add(sid)
+
+            assessment_cursor.execute(f"""
+                SELECT pdf_id, pdf_filename, MAX(started_at) as last_ts
+                FROM test_sessions
+                WHERE (pdf_id IN ({fn_marks}) OR pdf_filename IN ({fn_marks}))
+                  AND correct_answers > 0
+                GROUP BY pdf_id, pdf_filename
+            """, filenames + filenames)
+            for pid, pfn, last_ts in assessment_cursor.fetchall():
+                if not last_ts:
+                    continue
+                for key in (pid, pfn):
+                    if key:
+                        prev = last_test_map.get(key)
+                        if prev is None or last_ts > prev:
+                            last_test_map[key] = last_ts
+        except:
+            # Assessment database might not exist yet
+            pass
+
+        # --- Pass 2: assemble per-PDF dicts -----------------------------
+        for pdf_file, source_date, date_match, stat in entries:
             file_size_kb = stat.st_size / 1024
             last_modified = datetime.fromtimestamp(stat.st_mtime).isoformat()
 
             # For date_published, use extracted date or file creation date
             file_date = datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d')
 
-            # Check if this PDF's topics are in database
-            source_date = date_match if date_match else pdf_file.stem
-
-            cursor.execute("""
-                SELECT COUNT(*) as topic_count FROM topics WHERE source_date = ?
-            """, (source_date,))
-            topic_count = cursor.fetchone()['topic_count']
-
-            # Get topic count and categories
-            cursor.execute("""
-                SELECT COUNT(*) as total_topics FROM topics WHERE source_date = ?
-            """, (source_date,))
-            total_topics = cursor.fetchone()['total_topics'] or topic_count or 0
-
-            # Get categories
-            cursor.execute("""
-                SELECT DISTINCT category FROM topics WHERE source_date = ?
-            """, (source_date,))
-            categories = [row['category'] for row in cursor.fetchall()]
+            total_topics = topic_counts.get(source_date, 0)
+            categories = categories_map.get(source_date, [])
 
             # Track file modification-based revisions
-            # Check if we have tracked this PDF before
-            cursor.execute("""
-                SELECT last_modified, file_edit_count, view_count, date_added, extraction_attempted FROM pdfs WHERE filename = ?
-            """, (pdf_file.name,))
-            pdf_record = cursor.fetchone()
+            pdf_record = pdf_records.get(pdf_file.name)
 
             file_edit_count = 0
             view_count = 0
@@ -238,84 +455,33 @@ class PDFScanner:
                       total_topics, last_modified))
                 conn.commit()
 
-            # Get assessment attempts count for this PDF
-            # Need to query assessment database
-            assessment_attempts = 0
-            try:
-                assessment_conn = sqlite3.connect(Path(__file__).parent / "assessment_tracker.db")
-                assessment_cursor = assessment_conn.cursor()
-                # Match on source_date (date format), pdf_id, or pdf_filename
-                assessment_cursor.execute("""
-                    SELECT COUNT(DISTINCT qa.session_id) as attempt_count
-                    FROM question_attempts qa
-                    JOIN test_sessions ts ON qa.session_id = ts.session_id
-                    WHERE ts.source_date = ? OR ts.pdf_id = ? OR ts.pdf_filename = ? OR ts.source_date = ?
-                """, (source_date, source_date, pdf_file.name, pdf_file.name))
-                result = assessment_cursor.fetchone()
-                if result:
-                    assessment_attempts = result[0] or 0
-                assessment_conn.close()
-            except:
-                # Assessment database might not exist yet
-                pass
+            # Assessment attempts: distinct sessions matching this PDF's
+            # source_date or filename
+            assessment_attempts = len(
+                attempt_sessions.get(source_date, set())
+                | attempt_sessions.get(pdf_file.name, set()))
 
-            # Get last viewed timestamp from view sessions
+            # Last viewed timestamp + total view sessions
+            # Count ANY view session (not just complete ones) — she opened the article
             last_viewed = None
             days_since_view = None
-            # Count ANY view session (not just complete ones) — she opened the article
-            cursor.execute("""
-                SELECT COALESCE(completed_at, started_at) as last_ts
-                FROM pdf_view_sessions
-                WHERE pdf_id = ?
-                ORDER BY started_at DESC LIMIT 1
-            """, (pdf_file.name,))
-            view_result = cursor.fetchone()
-            if view_result and view_result['last_ts']:
-                last_viewed = view_result['last_ts']
+            view_row = view_map.get(pdf_file.name)
+            if view_row and view_row[0]:
+                last_viewed = view_row[0]
                 try:
                     view_dt = datetime.fromisoformat(last_viewed.replace('Z', '+00:00').split('+')[0])
                     days_since_view = (datetime.now() - view_dt).days
                 except:
                     pass
-            # Count total view sessions (opened the article at least once)
-            cursor.execute("""
-                SELECT COUNT(*) as cnt FROM pdf_view_sessions
-                WHERE pdf_id = ?
-            """, (pdf_file.name,))
-            view_count = cursor.fetchone()['cnt'] or view_count
-
-            # Get last annotation timestamp
-            last_annotation = None
-            annotation_count_total = 0
-            try:
-                cursor.execute("""
-                    SELECT MAX(timestamp) as last_ts, COUNT(*) as cnt
-                    FROM pdf_revision_records WHERE pdf_id = ?
-                """, (pdf_file.name,))
-                ann_row = cursor.fetchone()
-                if ann_row and ann_row['last_ts']:
-                    last_annotation = ann_row['last_ts']
-                    annotation_count_total = ann_row['cnt'] or 0
-            except:
-                pass
+            if view_row:
+                view_count = view_row[1] or view_count
 
-            # Get last test timestamp from assessment_tracker
-            last_test = None
-            try:
-                assessment_conn2 = sqlite3.connect(Path(__file__).parent / "assessment_tracker.db")
-                assessment_cursor2 = assessment_conn2.cursor()
-                assessment_cursor2.execute("""
-                    SELECT MAX(started_at) as last_ts
-                    FROM test_sessions
-                    WHERE (pdf_id = ? OR pdf_filename = ?)
-                      AND correct_answers > 0
-                """, (pdf_file.name, pdf_file.name))
-                test_row = assessment_cursor2.fetchone()
-                if test_row and test_row[0]:
-                    last_test = test_row[0]
-                assessment_conn2.close()
-            except:
-                pass
+            # Last annotation timestamp
+            ann_row = annotation_map.get(pdf_file.name)
+            last_annotation = ann_row[0] if ann_row else None
+
+            # Last passing test from assessment_tracker
+            last_test = last_test_map.get(pdf_file.name)
 
             # "Last Revised" = most recent meaningful activity (view, test, or annotation)
             # "Revision count" = views + tests (not individual pen strokes which
@@ -329,8 +495,12 @@ class PDFScanner:
                         activity_dates.append(dt)
                     except:
                         pass
-            last_revised = max(activity_dates).isoformat() if activity_dates else None
-            days_since_revision = (datetime.now() - max(activity_dates)).days if activity_dates else None
+            last_activity = max(activity_dates) if activity_dates else None
+            last_revised = last_activity.isoformat() if last_activity else None
+            # Epoch floats alongside ISO strings: filters compare these
+            # directly instead of re-parsing ISO per PDF per call
+            last_revised_ts = last_activity.timestamp() if last_activity else None
+            days_since_revision = (datetime.now() - last_activity).days if last_activity else None
             revision_count = view_count + assessment_attempts
 
             pdf_data = {
@@ -352,7 +522,9 @@ class PDFScanner:
                 'days_since_view': days_since_view,
                 'assessment_attempts': assessment_attempts,
                 'last_revised': last_revised,  # most recent activity (view/test/annotation)
+                'last_revised_ts': last_revised_ts,
                 'last_modified': last_modified,
+                'last_modified_ts': stat.st_mtime,
                 'file_size_kb': round(file_size_kb, 2),
                 'days_since_revision': days_since_revision,
                 'exists_in_db': total_topics > 0,
@@ -361,8 +533,6 @@ class PDFScanner:
 
             pdfs.append(pdf_data)
 
-        conn.close()
-
         # Sort by date (newest first)
         pdfs.sort(key=lambda x: x['date_published'], reverse=True)
 
@@ -373,58 +543,45 @@ class PDFScanner:
         # Pattern: current_affairs_2025_december_19.pdf
         # or: current_affairs_2025-12-19.pdf
 
-        # Try YYYY-MM-DD format
-        match = re.search(r'(\d{4})-(\d{2})-(\d{2})', filename)
+        # Try YYYY-MM-DD format - the match already is the full date, so
+        # return it directly (this also covered the old third pattern,
+        # which was the same regex again)
+        match = _DATE_ISO.search(filename)
         if match:
-            return f"{match.group(1)}-{match.group(2)}-{match.group(3)}"
+            return match.group(0)
 
         # Try YYYY_month_DD format
-        match = re.search(r'(\d{4})_(\w+)_(\d{1,2})', filename)
+        match = _DATE_MONTH.search(filename)
         if match:
             year = match.group(1)
             month = match.group(2).lower()
             day = match.group(3).zfill(2)
 
-            month_map = {
-                'january': '01', 'february': '02', 'march': '03', 'april': '04',
-                'may': '05', 'june': '06', 'july': '07', 'august': '08',
-                'september': '09', 'october': '10', 'november': '11', 'december': '12'
-            }
-
-            month_num = month_map.get(month, '01')
+            month_num = MONTH_MAP.get(month, '01')
             return f"{year}-{month_num}-{day}"
 
-        # Try to extract just date from source_date in topics table
-        match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
-        if match:
-            return match.group(1)
-
         return None
 
+    @staticmethod
+    def _iter_all_pdfs(all_pdfs: Dict):
+        """Single flat iterable over every bucket of a scan result."""
+        return itertools.chain(
+            all_pdfs['daily'],
+            all_pdfs.get('daily_drishti', []),
+            *all_pdfs['weekly'].values(),
+            all_pdfs['monthly'],
+        )
+
     def get_statistics(self) -> Dict:
         """Get overall statistics across all folders."""
         all_pdfs = self.scan_all_folders()
 
         total_pdfs = all_pdfs['total_count']
 
-        # Count never revised
-        never_revised = 0
-        for pdf in all_pdfs['daily']:
-            if pdf['revision_count'] == 0:
-                never_revised += 1
-
-        for pdf in all_pdfs.get('daily_drishti', []):
-            if pdf['revision_count'] == 0:
-                never_revised += 1
-
-        for source in all_pdfs['weekly'].values():
-            for pdf in source:
-                if pdf['revision_count'] == 0:
-                    never_revised += 1
-
-        for pdf in all_pdfs['monthly']:
-            if pdf['revision_count'] == 0:
-                never_revised += 1
+        # Count never revised - one pass over the chained buckets
+        never_revised = sum(
+            1 for pdf in self._iter_all_pdfs(all_pdfs)
+            if pdf['revision_count'] == 0)
 
         # Calculate completion rate
         completion_rate = round((total_pdfs - never_revised) / max(total_pdfs, 1) * 100, 1)
@@ -451,79 +608,25 @@ class PDFScanner:
         from datetime import timedelta
 
         all_pdfs = self.scan_all_folders()
-        cutoff_date = datetime.now() - timedelta(weeks=weeks)
-
-        filtered = []
+        # Compare epoch floats - no per-PDF datetime.fromisoformat
+        cutoff_ts = (datetime.now() - timedelta(weeks=weeks)).timestamp()
 
-        # Check daily
-        for pdf in all_pdfs['daily']:
-            if pdf['last_revised']:
-                last_rev = datetime.fromisoformat(pdf['last_revised'])
-                if last_rev < cutoff_date:
-                    filtered.append(pdf)
-            else:
-                # Never revised
-                filtered.append(pdf)
-
-        # Check weekly
-        for source_pdfs in all_pdfs['weekly'].values():
-            for pdf in source_pdfs:
-                if pdf['last_revised']:
-                    last_rev = datetime.fromisoformat(pdf['last_revised'])
-                    if last_rev < cutoff_date:
-                        filtered.append(pdf)
-                else:
-                    filtered.append(pdf)
-
-        # Check monthly
-        for pdf in all_pdfs['monthly']:
-            if pdf['last_revised']:
-                last_rev = datetime.fromisoformat(pdf['last_revised'])
-                if last_rev < cutoff_date:
-                    filtered.append(pdf)
-            else:
-                filtered.append(pdf)
-
-        return filtered
+        # Never revised (ts None) also qualifies
+        return [
+            pdf for pdf in self._iter_all_pdfs(all_pdfs)
+            if pdf.get('last_revised_ts') is None
+            or pdf['last_revised_ts'] < cutoff_ts
+        ]
 
     def filter_by_revision_count(self, min_count: int, max_count: Optional[int] = None) -> List[Dict]:
         """Get PDFs with specific revision count range."""
         all_pdfs = self.scan_all_folders()
 
-        filtered = []
-
-        # Check daily
-        for pdf in all_pdfs['daily']:
-            rev_count = pdf['revision_count']
-            if max_count is None:
-                if rev_count >= min_count:
-                    filtered.append(pdf)
-            else:
-                if min_count <= rev_count <= max_count:
-                    filtered.append(pdf)
-
-        # Check weekly
-        for source_pdfs in all_pdfs['weekly'].values():
-            for pdf in source_pdfs:
-                rev_count = pdf['revision_count']
-                if max_count is None:
-                    if rev_count >= min_count:
-                        filtered.append(pdf)
-                else:
-                    if min_count <= rev_count <= max_count:
-                        filtered.append(pdf)
-
-        # Check monthly
-        for pdf in all_pdfs['monthly']:
-            rev_count = pdf['revision_count']
-            if max_count is None:
-                if rev_count >= min_count:
-                    filtered.append(pdf)
-            else:
-                if min_count <= rev_count <= max_count:
-                    filtered.append(pdf)
-
-        return filtered
+        if max_count is None:
+            return [pdf for pdf in self._iter_all_pdfs(all_pdfs)
+                    if pdf['revision_count'] >= min_count]
+        return [pdf for pdf in self._iter_all_pdfs(all_pdfs)
+                if min_count <= pdf['revision_count'] <= max_count]
 
 
 if __name__ == '__main__':
@@ -67,6 +67,18 @@ class QuestionsDatabase:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_questions_category ON questions(category)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_question_choices_qid ON question_choices(question_id)")
 
+        # Unique index backs the IntegrityError dedupe in the insert
+        # paths: one O(log N) probe per row, no SELECT-before-insert.
+        # Skipped gracefully on legacy databases that already contain
+        # duplicate rows.
+        try:
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_pdf_text
+                ON questions(pdf_filename, question_text)
+            """)
+        except (sqlite3.IntegrityError, sqlite3.OperationalError):
+            pass
+
         conn.commit()
         conn.close()
 
@@ -134,18 +146,35 @@ class QuestionsDatabase:
     ) -> int:
         """
         Add multiple questions in a batch.
-        
+
         Args:
             pdf_filename: The PDF these questions belong to
             questions: List of dicts with 'front', 'back', 'deck', 'tags' keys
             source_name: Source identifier (career_launcher, legaledge)
             week_tag: Week tag (2025_Dec_W2)
-            
+
         Returns count of questions added.
         """
+        return len(self.add_questions_batch_with_ids(
+            pdf_filename, questions, source_name, week_tag))
+
+    def add_questions_batch_with_ids(
+        self,
+        pdf_filename: str,
+        questions: List[Dict],
+        source_name: str = None,
+        week_tag: str = None
+    ) -> List[Dict]:
+        """
+        Add multiple questions in a batch and return the inserted rows.
+
+        Each returned dict carries 'question_id', 'question' and 'answer'
+        (via cursor.lastrowid), so callers can pair IDs with questions
+        without re-reading the table after the insert.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
-        added_count = 0
+        inserted = []
 
         for q in questions:
             try:
@@ -154,8 +183,8 @@ class QuestionsDatabase:
                 category = deck_name.split('::')[-1] if '::' in deck_name else deck_name
 
                 cursor.execute("""
-                    INSERT INTO questions 
-                    (pdf_filename, question_text, answer_text, category, deck_name, 
+                    INSERT INTO questions
+                    (pdf_filename, question_text, answer_text, category, deck_name,
                      source_name, week_tag, tags, created_at)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
@@ -169,7 +198,12 @@ class QuestionsDatabase:
                     json.dumps(q.get('tags', [])),
                     datetime.now().isoformat()
                 ))
-                added_count += 1
+                inserted.append({
+                    'question_id': cursor.lastrowid,
+                    'question': q.get('front', ''),
+                    'answer': q.get('back', ''),
+                    'category': category,
+                })
 
             except sqlite3.IntegrityError:
                 # Duplicate question, skip
@@ -177,7 +211,7 @@ class QuestionsDatabase:
 
         conn.commit()
         conn.close()
-        return added_count
+        return inserted
 
     def get_questions_for_pdf(self, pdf_filename: str) -> List[Dict]:
         """
@@ -281,6 +315,42 @@ class QuestionsDatabase:
         finally:
             conn.close()
 
+    def save_mcq_choices_bulk(self, rows: List[tuple]) -> int:
+        """Save MCQ choices for many questions in one transaction.
+
+        One fsync for the whole set instead of one per question. Existing
+        choices for the affected questions are replaced, matching the
+        single-row update path.
+
+        Args:
+            rows: list of (question_id, choices list, correct_index) tuples
+
+        Returns count of rows saved.
+        """
+        if not rows:
+            return 0
+
+        conn = self._get_connection()
+        try:
+            now = datetime.now().isoformat()
+            with conn:
+                conn.executemany(
+                    "DELETE FROM question_choices WHERE question_id = ?",
+                    [(question_id,) for question_id, _, _ in rows])
+                conn.executemany("""
+                    INSERT INTO question_choices (question_id, choices, correct_index, created_at)
+                    VALUES (?, ?, ?, ?)
+                """, [
+                    (question_id, json.dumps(choices), correct_index, now)
+                    for question_id, choices, correct_index in rows
+                ])
+            return len(rows)
+        except Exception as e:
+            print(f"Error saving MCQ choices in bulk: {e}")
+            return 0
+        finally:
+            conn.close()
+
     def get_mcq_choices(self, question_id: int) -> Optional[Dict]:
         """Get MCQ choices for a question."""
         conn = self._get_connection()
@@ -1276,9 +1276,8 @@ class UnifiedHandler(SimpleHTTPRequestHandler):
 
             self.math_db.record_answer(session_id, question_id, selected_choice, is_correct, time_taken)
 
-            user_id = data.get('user_id', 'daughter')
-            self.math_db.update_topic_performance(user_id, topic, is_correct, time_taken)
-
+            # Topic performance is derived from math_answers on read now -
+            # no per-answer write amplification
             self.send_json({'success': True})
 
         elif path == '/api/math/session/complete':